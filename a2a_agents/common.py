@@ -0,0 +1,140 @@
+"""
+Helpers shared by the A2A agents
+"""
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+import jwt
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent connections to OpenAI for the whole process (tune to the rate tier)
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "500"))
+
+_openai_http_client: Optional[httpx.AsyncClient] = None
+
+def get_openai_http_client() -> httpx.AsyncClient:
+    """
+    Process-wide HTTP/2 client for OpenAI calls, created on first use.
+    Every agent's ChatOpenAI uses it, so all LLM requests share one multiplexed
+    connection pool capped at OPENAI_MAX_CONNECTIONS.
+    """
+    global _openai_http_client
+    if _openai_http_client is None or _openai_http_client.is_closed:
+        _openai_http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=min(200, OPENAI_MAX_CONNECTIONS)
+            ),
+            timeout=httpx.Timeout(120.0)
+        )
+    return _openai_http_client
+
+def error_result(log_message: str, summary_prefix: str, e: Exception) -> Dict[str, Any]:
+    """Log an exception and build the standard error result (with the traceback only when debugging)"""
+    logger.error("%s: %s", log_message, e, exc_info=logger.isEnabledFor(logging.DEBUG))
+    error = str(e)
+    return {
+        "status": "error",
+        "summary": f"{summary_prefix}: {error}",
+        "error": error
+    }
+
+def returns_error_result(log_message: str, summary_prefix: str):
+    """Wrap an async workflow handler so any exception is logged and returned as the standard error result"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await handler(*args, **kwargs)
+            except Exception as e:
+                return error_result(log_message, summary_prefix, e)
+        return wrapper
+    return decorator
+
+def prompt_json(obj: Any, indent: bool = False) -> str:
+    """JSON for LLM prompts (orjson, C-accelerated); compact unless indent is set"""
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+    return orjson.dumps(obj, option=option).decode()
+
+# Privacy settings are process-wide; resolve them once at import
+ALLOW_PII_IN_LLM_PROMPTS = os.getenv("ALLOW_PII_IN_LLM_PROMPTS", "false").lower() == "true"
+_ANONYMOUS_ID_SALT = os.getenv("ANONYMOUS_ID_SALT", "streamward-privacy-salt")
+
+@functools.lru_cache(maxsize=1024)
+def anonymous_id(email: str) -> str:
+    """Consistent, non-reversible anonymous ID for an email (cached per process)"""
+    return hashlib.sha256(f"{email}{_ANONYMOUS_ID_SALT}".encode()).hexdigest()[:16]
+
+# Exchanged tokens are reused until this many seconds before their "exp" claim;
+# tokens whose expiry can't be read are reused for the fallback TTL
+TOKEN_EXCHANGE_EXPIRY_MARGIN = 30
+TOKEN_EXCHANGE_FALLBACK_TTL = 240
+
+def _token_cache_ttl(token: str) -> float:
+    """Seconds an exchanged token may be reused, from its (unverified) exp claim"""
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.PyJWTError:
+        return TOKEN_EXCHANGE_FALLBACK_TTL
+    if not isinstance(exp, (int, float)):
+        return TOKEN_EXCHANGE_FALLBACK_TTL
+    return exp - time.time() - TOKEN_EXCHANGE_EXPIRY_MARGIN
+
+class TokenExchangeCache:
+    """
+    Okta token exchanges made with one agent's service app credentials, reusing an earlier
+    exchange of the same token for the same audience and scope until shortly before it expires.
+    A per-key lock keeps concurrent callers from all missing the cache at once.
+    """
+    
+    __slots__ = ("source_agent", "_cache", "_locks")
+    
+    def __init__(self, source_agent: str):
+        self.source_agent = source_agent
+        # (source token digest, audience, scope) -> (token, monotonic expiry)
+        self._cache: Dict[tuple, tuple] = {}
+        # Per-key single-flight locks: key -> [lock, callers holding or waiting on it]; an entry is
+        # removed as soon as no caller references it, so failed exchanges don't leave locks behind
+        self._locks: Dict[tuple, List[Any]] = {}
+    
+    async def exchange(self, okta_auth, current_token: str, target_audience: str, scope: str) -> str:
+        """Exchange current_token via okta_auth, or return a cached exchange that is still valid"""
+        key = (hashlib.sha256(current_token.encode()).digest()[:16], target_audience, scope)
+        lock_entry = self._locks.get(key)
+        if lock_entry is None:
+            lock_entry = self._locks[key] = [asyncio.Lock(), 0]
+        lock_entry[1] += 1
+        try:
+            async with lock_entry[0]:
+                cached = self._cache.get(key)
+                if cached and cached[1] > time.monotonic():
+                    return cached[0]
+                
+                exchanged_token = await okta_auth.exchange_token(
+                    token=current_token,
+                    target_audience=target_audience,
+                    scope=scope,
+                    source_agent=self.source_agent
+                )
+                
+                # Drop expired entries so the cache doesn't grow with every user token seen
+                now = time.monotonic()
+                for stale_key in [k for k, (_, expiry) in self._cache.items() if expiry <= now]:
+                    del self._cache[stale_key]
+                ttl = _token_cache_ttl(exchanged_token)
+                if ttl > 0:
+                    self._cache[key] = (exchanged_token, now + ttl)
+                return exchanged_token
+        finally:
+            lock_entry[1] -= 1
+            if not lock_entry[1]:
+                del self._locks[key]
@@ -1,28 +1,78 @@
 import logging
-import os
-import hashlib
 from typing import Dict, Any, Optional, List
-from datetime import datetime
-import json
 import asyncio
+import time
+import uuid
 
 from langchain.schema import HumanMessage, AIMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from auth.okta_scopes import OKTA_SCOPES, get_cross_agent_scope
+from a2a_agents.common import (
+    ALLOW_PII_IN_LLM_PROMPTS,
+    TokenExchangeCache,
+    anonymous_id,
+    get_openai_http_client,
+    prompt_json,
+    returns_error_result,
+)
+from utils.timestamps import iso_now
 
 logger = logging.getLogger(__name__)
 
+# Static workflow steps (shared across calls; copied into responses where needed)
+PAYROLL_TASKS = (
+    "Create employee payroll record",
+    "Set up direct deposit information",
+    "Configure tax withholdings",
+    "Set up benefits deductions",
+    "Schedule first payroll run",
+    "Generate employee ID for payroll system"
+)
+
+COMPLIANCE_CHECKS = (
+    "Financial record completeness",
+    "SOX compliance verification",
+    "Expense policy compliance",
+    "Budget adherence verification",
+    "Transaction audit trail completeness",
+    "Financial reporting accuracy"
+)
+
+# Follows the per-request "Calculate <change> impact for <benefit>" task
+BENEFITS_FINANCIAL_TASKS = (
+    "Update payroll deductions",
+    "Verify budget availability",
+    "Process benefits provider changes",
+    "Update employee financial records"
+)
+
+# CIBA approvals: how often pending requests are polled, and the demo's simulated user response time
+CIBA_POLL_INTERVAL = 0.25
+CIBA_SIMULATED_RESPONSE_TIME = 1.0
+
 class FinanceAgent:
     """
     Finance A2A Agent for financial transactions and approvals
     Handles token exchange with other agents and includes human approval capability
     """
     
+    # workflow_type -> handler method name; anything else goes to _handle_general_finance_task
+    _WORKFLOW_HANDLERS = {
+        "employee_onboarding": "_handle_employee_onboarding_finance",
+        "expense_approval": "_handle_expense_approval",
+        "compliance_audit": "_handle_compliance_audit_finance",
+        "benefits_change": "_handle_benefits_change_finance",
+    }
+    
+    # Expenses above this amount require human approval via CIBA
+    EXPENSE_APPROVAL_THRESHOLD = 1000.00
+    
     def __init__(self, okta_auth=None):
         self.llm = ChatOpenAI(
             model="gpt-4",
             temperature=0.3,
-            max_tokens=1000
+            max_tokens=1000,
+            http_async_client=get_openai_http_client()
         )
         self.okta_auth = okta_auth
         
@@ -38,6 +88,7 @@ You are the Finance A2A Agent for Streamward Corporation. Your responsibilities
 You are the only agent with human approval capability for high-value financial operations.
 Always maintain detailed audit trails and coordinate with other agents as needed.
 """
+        self._system_message = SystemMessage(content=self.system_prompt)
         
         # Mock financial data
         self.transactions = {
@@ -58,275 +109,273 @@ Always maintain detailed audit trails and coordinate with other agents as needed
                 "approval_required": True
             }
         }
+        
+        # Pending CIBA approvals: request ID -> (event, monotonic start); decisions land in _ciba_results
+        self._pending_ciba: Dict[str, tuple] = {}
+        self._ciba_results: Dict[str, str] = {}
+        self._ciba_poller_task: Optional[asyncio.Task] = None
+        
+        # Token exchanges made with the Finance service app credentials, reused until near expiry
+        self._token_exchanges = TokenExchangeCache("finance")
+        
+        # Secondary index: employee_id -> transaction IDs (kept in sync by _record_transaction)
+        self._transactions_by_employee: Dict[str, List[str]] = {}
+        for txn_id, txn in self.transactions.items():
+            self._transactions_by_employee.setdefault(txn["employee_id"], []).append(txn_id)
 
+    @returns_error_result("Finance Agent error", "Finance Agent encountered an error")
     async def process_workflow_task(self, workflow_type: str, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> Dict[str, Any]:
         """
         Process Finance workflow tasks with token exchange and human approval
         """
-        try:
-            logger.info(f"Finance Agent processing workflow: {workflow_type}")
-            
-            if workflow_type == "employee_onboarding":
-                return await self._handle_employee_onboarding_finance(parameters, user_info, token)
-            elif workflow_type == "expense_approval":
-                return await self._handle_expense_approval(parameters, user_info, token)
-            elif workflow_type == "compliance_audit":
-                return await self._handle_compliance_audit_finance(parameters, user_info, token)
-            elif workflow_type == "benefits_change":
-                return await self._handle_benefits_change_finance(parameters, user_info, token)
-            else:
-                return await self._handle_general_finance_task(workflow_type, parameters, user_info, token)
-                
-        except Exception as e:
-            logger.error(f"Finance Agent error: {e}")
-            return {
-                "status": "error",
-                "summary": f"Finance Agent encountered an error: {str(e)}",
-                "error": str(e)
-            }
+        logger.info("Finance Agent processing workflow: %s", workflow_type)
+        
+        handler_name = self._WORKFLOW_HANDLERS.get(workflow_type)
+        if handler_name:
+            return await getattr(self, handler_name)(parameters, user_info, token)
+        return await self._handle_general_finance_task(workflow_type, parameters, user_info, token)
 
+    @returns_error_result("Employee onboarding finance error", "Financial onboarding failed")
     async def _handle_employee_onboarding_finance(self, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> Dict[str, Any]:
         """Handle financial aspects of employee onboarding"""
-        try:
-            employee_name = parameters.get("employee_name", "New Employee")
-            department = parameters.get("department", "Unknown")
-            salary = parameters.get("salary", 75000)
-            
-            # Exchange token with HR agent for employee verification
-            hr_token = await self._exchange_token_with_hr(token, "employee_verification")
-            
-            # Exchange token with Legal agent for compliance check
-            legal_token = await self._exchange_token_with_legal(token, "compliance_verification")
-            
-            # Set up payroll
-            payroll_tasks = [
-                "Create employee payroll record",
-                "Set up direct deposit information",
-                "Configure tax withholdings",
-                "Set up benefits deductions",
-                "Schedule first payroll run",
-                "Generate employee ID for payroll system"
+        employee_name = parameters.get("employee_name", "New Employee")
+        department = parameters.get("department", "Unknown")
+        salary = parameters.get("salary", 75000)
+        
+        # Exchange tokens with HR (employee verification) and Legal (compliance check) concurrently
+        hr_token, legal_token = await asyncio.gather(
+            self._exchange_token_with_hr(token, "employee_verification"),
+            self._exchange_token_with_legal(token, "compliance_verification")
+        )
+        
+        # Process payroll setup (tasks are independent, so simulate them as one step)
+        completed_tasks = list(PAYROLL_TASKS)
+        await asyncio.sleep(0.1)  # Simulate processing
+        
+        # Check if human approval is needed for high-value onboarding
+        approval_required = salary > 100000
+        approval_status = "pending" if approval_required else "auto_approved"
+        
+        if approval_required:
+            # Initiate CIBA flow for human approval
+            ciba_result = await self._initiate_ciba_approval(
+                f"High-value employee onboarding: {employee_name} - ${salary:,}",
+                user_info
+            )
+            approval_status = ciba_result["status"]
+        
+        return {
+            "status": "completed",
+            "summary": f"Financial onboarding completed for {employee_name}",
+            "completed_tasks": completed_tasks,
+            "salary": salary,
+            "approval_status": approval_status,
+            "payroll_id": f"PAY{len(self.transactions) + 1:03d}",
+            "token_exchanges": {
+                "hr_token": hr_token,
+                "legal_token": legal_token
+            },
+            "next_steps": [
+                "HR agent will complete benefits setup",
+                "Legal agent will verify compliance",
+                "First payroll will be processed on next cycle"
             ]
-            
-            # Process payroll setup
-            completed_tasks = []
-            for task in payroll_tasks:
-                await asyncio.sleep(0.1)  # Simulate processing
-                completed_tasks.append(task)
-            
-            # Check if human approval is needed for high-value onboarding
-            approval_required = salary > 100000
-            approval_status = "pending" if approval_required else "auto_approved"
-            
-            if approval_required:
-                # Initiate CIBA flow for human approval
-                ciba_result = await self._initiate_ciba_approval(
-                    f"High-value employee onboarding: {employee_name} - ${salary:,}",
-                    user_info
-                )
-                approval_status = ciba_result["status"]
-            
-            return {
-                "status": "completed",
-                "summary": f"Financial onboarding completed for {employee_name}",
-                "completed_tasks": completed_tasks,
-                "salary": salary,
-                "approval_status": approval_status,
-                "payroll_id": f"PAY{len(self.transactions) + 1:03d}",
-                "token_exchanges": {
-                    "hr_token": hr_token,
-                    "legal_token": legal_token
-                },
-                "next_steps": [
-                    "HR agent will complete benefits setup",
-                    "Legal agent will verify compliance",
-                    "First payroll will be processed on next cycle"
-                ]
-            }
-            
-        except Exception as e:
-            logger.error(f"Employee onboarding finance error: {e}")
-            return {
-                "status": "error",
-                "summary": f"Financial onboarding failed: {str(e)}",
-                "error": str(e)
-            }
+        }
 
+    @returns_error_result("Expense approval error", "Expense approval failed")
     async def _handle_expense_approval(self, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> Dict[str, Any]:
         """Handle expense approval with human approval for high-value transactions"""
+        amount = parameters.get("amount", 0)
+        description = parameters.get("description", "")
+        
+        # Exchange tokens with HR (employee verification) and Legal (compliance check) concurrently
+        hr_token, legal_token = await asyncio.gather(
+            self._exchange_token_with_hr(token, "employee_verification"),
+            self._exchange_token_with_legal(token, "expense_compliance")
+        )
+        
+        # Determine if human approval is required
+        approval_required = amount > self.EXPENSE_APPROVAL_THRESHOLD
+        
+        approval_status = "auto_approved"
+        if approval_required:
+            # Initiate CIBA flow for human approval
+            ciba_result = await self._initiate_ciba_approval(
+                f"High-value expense approval: ${amount:,.2f} - {description}",
+                user_info
+            )
+            approval_status = ciba_result["status"]
+        
+        return self._record_expense(
+            parameters, approval_status, approval_required,
+            {"hr_token": hr_token, "legal_token": legal_token},
+            iso_now()
+        )
+
+    async def handle_expense_approvals_batch(self, expenses: List[Dict[str, Any]], user_info: Dict[str, Any], token: str) -> List[Dict[str, Any]]:
+        """
+        Process a batch of expense approvals through one approval pipeline.
+        One HR/Legal token pair is exchanged for the whole batch, and all
+        high-value expenses are covered by a single CIBA approval request.
+        Returns one result per expense, in input order. If the shared token exchange or CIBA
+        step fails, nothing is recorded and every result is an error; after that each expense is
+        recorded independently, so a failure only marks that expense as an error (callers retry
+        just the failed items without duplicating the recorded ones).
+        """
         try:
-            amount = parameters.get("amount", 0)
-            employee_id = parameters.get("employee_id", "unknown")
-            category = parameters.get("category", "other")
-            description = parameters.get("description", "")
+            hr_token, legal_token = await asyncio.gather(
+                self._exchange_token_with_hr(token, "batch_employee_verification"),
+                self._exchange_token_with_legal(token, "batch_expense_compliance")
+            )
             
-            # Exchange token with HR agent for employee verification
-            hr_token = await self._exchange_token_with_hr(token, "employee_verification")
+            high_value = [e for e in expenses if e.get("amount", 0) > self.EXPENSE_APPROVAL_THRESHOLD]
             
-            # Exchange token with Legal agent for compliance check
-            legal_token = await self._exchange_token_with_legal(token, "expense_compliance")
-            
-            # Financial checks
-            financial_checks = [
-                f"Amount verification: ${amount:,.2f}",
-                f"Category validation: {category}",
-                "Budget availability check",
-                "Expense policy compliance",
-                "Receipt verification status"
-            ]
-            
-            # Determine if human approval is required
-            approval_threshold = 1000.00  # $1000 threshold
-            approval_required = amount > approval_threshold
-            
-            approval_status = "auto_approved"
-            if approval_required:
-                # Initiate CIBA flow for human approval
+            ciba_status = "auto_approved"
+            if high_value:
+                # One human approval covers every expense above the threshold
+                total = sum(e.get("amount", 0) for e in high_value)
                 ciba_result = await self._initiate_ciba_approval(
-                    f"High-value expense approval: ${amount:,.2f} - {description}",
+                    f"Batch expense approval: {len(high_value)} expenses totaling ${total:,.2f}",
                     user_info
                 )
-                approval_status = ciba_result["status"]
-            
-            # Create transaction record
-            transaction_id = f"TXN{len(self.transactions) + 1:03d}"
-            self.transactions[transaction_id] = {
-                "id": transaction_id,
-                "type": "expense",
-                "amount": amount,
-                "employee_id": employee_id,
-                "category": category,
-                "description": description,
-                "status": approval_status,
-                "approval_required": approval_required,
-                "created_at": datetime.now().isoformat()
-            }
-            
-            return {
-                "status": "completed",
-                "summary": f"Expense approval processed: ${amount:,.2f}",
-                "transaction_id": transaction_id,
-                "approval_status": approval_status,
-                "approval_required": approval_required,
-                "financial_checks": financial_checks,
-                "token_exchanges": {
-                    "hr_token": hr_token,
-                    "legal_token": legal_token
-                },
-                "audit_trail": {
-                    "processed_by": "Finance Agent",
-                    "processed_at": datetime.now().isoformat(),
-                    "approval_method": "CIBA" if approval_required else "auto",
-                    "amount": amount
-                }
-            }
-            
+                ciba_status = ciba_result["status"]
         except Exception as e:
-            logger.error(f"Expense approval error: {e}")
-            return {
+            logger.error("Batch expense approval error: %s", e)
+            return [{
                 "status": "error",
-                "summary": f"Expense approval failed: {str(e)}",
+                "summary": f"Batch expense approval failed: {str(e)}",
                 "error": str(e)
+            } for _ in expenses]
+        
+        processed_at = iso_now()
+        token_exchanges = {"hr_token": hr_token, "legal_token": legal_token}
+        results = []
+        for expense in expenses:
+            try:
+                approval_required = expense.get("amount", 0) > self.EXPENSE_APPROVAL_THRESHOLD
+                approval_status = ciba_status if approval_required else "auto_approved"
+                results.append(self._record_expense(expense, approval_status, approval_required, token_exchanges, processed_at))
+            except Exception as e:
+                logger.error("Batch expense record error: %s", e)
+                results.append({
+                    "status": "error",
+                    "summary": f"Expense approval failed: {str(e)}",
+                    "error": str(e)
+                })
+        return results
+
+    def _record_expense(self, parameters: Dict[str, Any], approval_status: str, approval_required: bool, token_exchanges: Dict[str, str], processed_at: str) -> Dict[str, Any]:
+        """Create the transaction record for an expense and build its approval result"""
+        amount = parameters.get("amount", 0)
+        employee_id = parameters.get("employee_id", "unknown")
+        category = parameters.get("category", "other")
+        description = parameters.get("description", "")
+        
+        # Financial checks
+        financial_checks = [
+            f"Amount verification: ${amount:,.2f}",
+            f"Category validation: {category}",
+            "Budget availability check",
+            "Expense policy compliance",
+            "Receipt verification status"
+        ]
+        
+        # Create transaction record (one timestamp shared by the record and audit trail)
+        transaction_id = f"TXN{len(self.transactions) + 1:03d}"
+        self._record_transaction({
+            "id": transaction_id,
+            "type": "expense",
+            "amount": amount,
+            "employee_id": employee_id,
+            "category": category,
+            "description": description,
+            "status": approval_status,
+            "approval_required": approval_required,
+            "created_at": processed_at
+        })
+        
+        return {
+            "status": "completed",
+            "summary": f"Expense approval processed: ${amount:,.2f}",
+            "transaction_id": transaction_id,
+            "approval_status": approval_status,
+            "approval_required": approval_required,
+            "financial_checks": financial_checks,
+            "token_exchanges": token_exchanges,
+            "audit_trail": {
+                "processed_by": "Finance Agent",
+                "processed_at": processed_at,
+                "approval_method": "CIBA" if approval_required else "auto",
+                "amount": amount
             }
+        }
 
+    @returns_error_result("Compliance audit finance error", "Financial compliance audit failed")
     async def _handle_compliance_audit_finance(self, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> Dict[str, Any]:
         """Handle financial compliance audit"""
-        try:
-            audit_scope = parameters.get("audit_scope", "general")
-            
-            # Exchange tokens with other agents for comprehensive audit
-            hr_token = await self._exchange_token_with_hr(token, "hr_audit_coordination")
-            legal_token = await self._exchange_token_with_legal(token, "legal_audit_coordination")
-            
-            # Financial compliance checks
-            compliance_checks = [
-                "Financial record completeness",
-                "SOX compliance verification",
-                "Expense policy compliance",
-                "Budget adherence verification",
-                "Transaction audit trail completeness",
-                "Financial reporting accuracy"
+        audit_scope = parameters.get("audit_scope", "general")
+        
+        # Exchange tokens with other agents for comprehensive audit (concurrently)
+        hr_token, legal_token = await asyncio.gather(
+            self._exchange_token_with_hr(token, "hr_audit_coordination"),
+            self._exchange_token_with_legal(token, "legal_audit_coordination")
+        )
+        
+        # Simulate audit process (checks are independent, so simulate them as one step)
+        audit_results = {check: "compliant" for check in COMPLIANCE_CHECKS}
+        await asyncio.sleep(0.1)  # Simulate processing
+        
+        return {
+            "status": "completed",
+            "summary": "Financial compliance audit completed",
+            "audit_results": audit_results,
+            "compliance_score": "98%",
+            "token_exchanges": {
+                "hr_token": hr_token,
+                "legal_token": legal_token
+            },
+            "recommendations": [
+                "Implement additional expense controls",
+                "Enhance transaction monitoring",
+                "Update financial policies"
             ]
-            
-            # Simulate audit process
-            audit_results = {}
-            for check in compliance_checks:
-                await asyncio.sleep(0.1)  # Simulate processing
-                audit_results[check] = "compliant"
-            
-            return {
-                "status": "completed",
-                "summary": "Financial compliance audit completed",
-                "audit_results": audit_results,
-                "compliance_score": "98%",
-                "token_exchanges": {
-                    "hr_token": hr_token,
-                    "legal_token": legal_token
-                },
-                "recommendations": [
-                    "Implement additional expense controls",
-                    "Enhance transaction monitoring",
-                    "Update financial policies"
-                ]
-            }
-            
-        except Exception as e:
-            logger.error(f"Compliance audit finance error: {e}")
-            return {
-                "status": "error",
-                "summary": f"Financial compliance audit failed: {str(e)}",
-                "error": str(e)
-            }
+        }
 
+    @returns_error_result("Benefits change finance error", "Financial benefits change failed")
     async def _handle_benefits_change_finance(self, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> Dict[str, Any]:
         """Handle financial aspects of benefits changes"""
-        try:
-            employee_id = parameters.get("employee_id", "unknown")
-            benefit_type = parameters.get("benefit_type", "unknown")
-            change_type = parameters.get("change_type", "modify")
-            
-            # Exchange token with HR agent
-            hr_token = await self._exchange_token_with_hr(token, "benefits_coordination")
-            
-            # Financial processing tasks
-            financial_tasks = [
-                f"Calculate {change_type} impact for {benefit_type}",
-                "Update payroll deductions",
-                "Verify budget availability",
-                "Process benefits provider changes",
-                "Update employee financial records"
-            ]
-            
-            # Check if human approval is needed for significant changes
-            approval_required = change_type == "add" and benefit_type in ["Stock Options", "Executive Benefits"]
-            approval_status = "auto_approved"
-            
-            if approval_required:
-                ciba_result = await self._initiate_ciba_approval(
-                    f"Benefits change approval: {change_type} {benefit_type}",
-                    user_info
-                )
-                approval_status = ciba_result["status"]
-            
-            return {
-                "status": "completed",
-                "summary": f"Financial benefits {change_type} completed",
-                "benefit_type": benefit_type,
-                "change_type": change_type,
-                "approval_status": approval_status,
-                "financial_tasks": financial_tasks,
-                "token_exchanges": {
-                    "hr_token": hr_token
-                }
-            }
-            
-        except Exception as e:
-            logger.error(f"Benefits change finance error: {e}")
-            return {
-                "status": "error",
-                "summary": f"Financial benefits change failed: {str(e)}",
-                "error": str(e)
+        employee_id = parameters.get("employee_id", "unknown")
+        benefit_type = parameters.get("benefit_type", "unknown")
+        change_type = parameters.get("change_type", "modify")
+        
+        # Exchange token with HR agent
+        hr_token = await self._exchange_token_with_hr(token, "benefits_coordination")
+        
+        # Financial processing tasks
+        financial_tasks = [f"Calculate {change_type} impact for {benefit_type}", *BENEFITS_FINANCIAL_TASKS]
+        
+        # Check if human approval is needed for significant changes
+        approval_required = change_type == "add" and benefit_type in ["Stock Options", "Executive Benefits"]
+        approval_status = "auto_approved"
+        
+        if approval_required:
+            ciba_result = await self._initiate_ciba_approval(
+                f"Benefits change approval: {change_type} {benefit_type}",
+                user_info
+            )
+            approval_status = ciba_result["status"]
+        
+        return {
+            "status": "completed",
+            "summary": f"Financial benefits {change_type} completed",
+            "benefit_type": benefit_type,
+            "change_type": change_type,
+            "approval_status": approval_status,
+            "financial_tasks": financial_tasks,
+            "token_exchanges": {
+                "hr_token": hr_token
             }
+        }
 
     def _sanitize_user_info_for_llm(self, user_info: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -338,9 +387,7 @@ Always maintain detailed audit trails and coordinate with other agents as needed
         minimal = {}
         
         # Privacy setting: Check if PII is allowed
-        allow_pii = os.getenv("ALLOW_PII_IN_LLM_PROMPTS", "false").lower() == "true"
-        
-        if allow_pii:
+        if ALLOW_PII_IN_LLM_PROMPTS:
             # Privacy Level 3: Include email/name
             if user_info.get("email"):
                 minimal["email"] = user_info["email"]
@@ -349,114 +396,138 @@ Always maintain detailed audit trails and coordinate with other agents as needed
         else:
             # Privacy Level 1: Anonymous ID only
             email = user_info.get("email", "anonymous")
-            salt = os.getenv("ANONYMOUS_ID_SALT", "streamward-privacy-salt")
-            anonymous_id = hashlib.sha256(f"{email}{salt}".encode()).hexdigest()[:16]
-            minimal["user_id"] = f"user_{anonymous_id}"
+            minimal["user_id"] = f"user_{anonymous_id(email)}"
         return minimal
     
+    @returns_error_result("General finance task error", "General finance task failed")
     async def _handle_general_finance_task(self, workflow_type: str, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> Dict[str, Any]:
         """Handle general finance tasks"""
-        try:
-            # Sanitize user_info before sending to LLM (security)
-            safe_user_info = self._sanitize_user_info_for_llm(user_info)
-            
-            # Use LLM to process general finance requests
-            prompt = f"""
-            Process this Finance workflow task:
-            
-            Workflow Type: {workflow_type}
-            Parameters: {json.dumps(parameters, indent=2)}
-            User Info: {json.dumps(safe_user_info, indent=2)}
-            
-            Provide a summary of financial actions taken and recommendations.
-            Consider if human approval is needed for high-value transactions.
-            """
-            
-            messages = [
-                SystemMessage(content=self.system_prompt),
-                HumanMessage(content=prompt)
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            
-            return {
-                "status": "completed",
-                "summary": response.content,
-                "workflow_type": workflow_type,
-                "finance_actions": ["General finance processing completed"]
-            }
-            
-        except Exception as e:
-            logger.error(f"General finance task error: {e}")
-            return {
-                "status": "error",
-                "summary": f"General finance task failed: {str(e)}",
-                "error": str(e)
-            }
+        # Sanitize user_info before sending to LLM (security)
+        safe_user_info = self._sanitize_user_info_for_llm(user_info)
+        
+        # Use LLM to process general finance requests
+        prompt = f"""
+        Process this Finance workflow task:
+        
+        Workflow Type: {workflow_type}
+        Parameters: {prompt_json(parameters)}
+        User Info: {prompt_json(safe_user_info)}
+        
+        Provide a summary of financial actions taken and recommendations.
+        Consider if human approval is needed for high-value transactions.
+        """
+        
+        messages = [
+            self._system_message,
+            HumanMessage(content=prompt)
+        ]
+        
+        response = await self.llm.ainvoke(messages)
+        
+        return {
+            "status": "completed",
+            "summary": response.content,
+            "workflow_type": workflow_type,
+            "finance_actions": ["General finance processing completed"]
+        }
 
     async def _initiate_ciba_approval(self, approval_request: str, user_info: Dict[str, Any]) -> Dict[str, Any]:
         """
         Initiate CIBA (Client Initiated Backchannel Authentication) flow for human approval
         This is a simplified implementation - in production, you'd integrate with actual CIBA provider
+        
+        Each request registers an asyncio.Event and waits on it; a single background poller
+        checks all pending requests together and wakes each waiter when its decision arrives.
         """
         try:
-            logger.info(f"Initiating CIBA approval: {approval_request}")
+            logger.info("Initiating CIBA approval: %s", approval_request)
             
-            # Simulate CIBA flow
-            ciba_request_id = f"CIBA-{datetime.now().timestamp()}"
+            # In production, this would send a push notification to the user's device
+            ciba_request_id = f"CIBA-{time.time()}-{uuid.uuid4().hex[:8]}"
+            event = asyncio.Event()
+            self._pending_ciba[ciba_request_id] = (event, time.monotonic())
             
-            # In production, this would:
-            # 1. Send push notification to user's device
-            # 2. Wait for user approval/denial
-            # 3. Return the result
+            if self._ciba_poller_task is None or self._ciba_poller_task.done():
+                self._ciba_poller_task = asyncio.create_task(self._ciba_poller())
             
-            # For demo purposes, simulate approval after delay
-            await asyncio.sleep(1.0)  # Simulate user response time
+            try:
+                await event.wait()
+            finally:
+                self._pending_ciba.pop(ciba_request_id, None)
+            ciba_status = self._ciba_results.pop(ciba_request_id)
             
-            # Mock approval result (in production, this comes from CIBA response)
             # Use email instead of sub for user identification (security: sub is internal ID)
             approval_result = {
                 "ciba_request_id": ciba_request_id,
-                "status": "approved",  # or "denied"
-                "approved_at": datetime.now().isoformat(),
+                "status": ciba_status,  # "approved" or "denied"
+                "approved_at": iso_now(),
                 "approval_request": approval_request,
                 "user_email": user_info.get("email", "unknown")  # Use email, not sub
             }
             
-            logger.info(f"CIBA approval completed: {approval_result['status']}")
+            logger.info("CIBA approval completed: %s", approval_result['status'])
             
             return approval_result
             
         except Exception as e:
-            logger.error(f"CIBA approval error: {e}")
+            logger.error("CIBA approval error: %s", e)
             return {
-                "ciba_request_id": f"CIBA-ERROR-{datetime.now().timestamp()}",
+                "ciba_request_id": f"CIBA-ERROR-{time.time()}",
                 "status": "error",
                 "error": str(e)
             }
 
+    async def _ciba_poller(self) -> None:
+        """Poll all pending CIBA requests in one batch per interval until none remain"""
+        while self._pending_ciba:
+            await asyncio.sleep(CIBA_POLL_INTERVAL)
+            pending = {request_id: started for request_id, (_, started) in self._pending_ciba.items()}
+            try:
+                decisions = await self._poll_ciba_status(pending)
+            except Exception as e:
+                logger.error("CIBA status poll error: %s", e)
+                decisions = {request_id: "error" for request_id in pending}
+            for request_id, status in decisions.items():
+                entry = self._pending_ciba.get(request_id)
+                if entry:
+                    self._ciba_results[request_id] = status
+                    entry[0].set()
+
+    async def _poll_ciba_status(self, pending: Dict[str, float]) -> Dict[str, str]:
+        """
+        Return decisions for whichever pending CIBA requests have been answered.
+        In production this is one batched status call to the CIBA provider for all request IDs;
+        for the demo, a request is approved once the simulated user response time has passed.
+        """
+        now = time.monotonic()
+        return {
+            request_id: "approved"
+            for request_id, started in pending.items()
+            if now - started >= CIBA_SIMULATED_RESPONSE_TIME
+        }
+
     async def _exchange_token_with_hr(self, current_token: str, purpose: str) -> str:
         """Exchange token with HR agent using RFC 8693 Token Exchange"""
         if self.okta_auth:
             try:
                 # Exchange to HR server - must request HR scopes (not Finance scopes!)
                 # HR server only has HR scopes
-                exchanged_token = await self.okta_auth.exchange_token(
-                    token=current_token,
+                exchanged_token = await self._token_exchanges.exchange(
+                    self.okta_auth,
+                    current_token,
                     target_audience=self.okta_auth.hr_audience,
                     scope=get_cross_agent_scope("finance", "hr"),  # HR server scope
-                    source_agent="finance"  # Use Finance service app credentials
                 )
-                logger.info(f"Finance Agent exchanged token with HR agent for: {purpose}")
+                logger.info("Finance Agent exchanged token with HR agent for: %s", purpose)
                 return exchanged_token
             except Exception as e:
-                logger.error(f"Token exchange with HR agent failed: {e}")
+                logger.error("Token exchange with HR agent failed: %s", e)
                 # Fallback to simulated token for demo purposes
-                return f"finance-to-hr-token-{purpose}-{datetime.now().timestamp()}"
+                return f"finance-to-hr-token-{purpose}-{time.time_ns()}"
         else:
             # Fallback to simulated token if okta_auth not available
             logger.warning("OktaAuth not available, using simulated token exchange")
-            return f"finance-to-hr-token-{purpose}-{datetime.now().timestamp()}"
+            return f"finance-to-hr-token-{purpose}-{time.time_ns()}"
 
     async def _exchange_token_with_legal(self, current_token: str, purpose: str) -> str:
         """Exchange token with Legal agent using RFC 8693 Token Exchange"""
@@ -464,26 +535,26 @@ Always maintain detailed audit trails and coordinate with other agents as needed
             try:
                 # Exchange to Legal server - must request Legal scopes (not Finance scopes!)
                 # Legal server only has Legal scopes
-                exchanged_token = await self.okta_auth.exchange_token(
-                    token=current_token,
+                exchanged_token = await self._token_exchanges.exchange(
+                    self.okta_auth,
+                    current_token,
                     target_audience=self.okta_auth.legal_audience,
                     scope=OKTA_SCOPES.LEGAL.COMPLIANCE_VERIFY,  # Legal server scope
-                    source_agent="finance"  # Use Finance service app credentials
                 )
-                logger.info(f"Finance Agent exchanged token with Legal agent for: {purpose}")
+                logger.info("Finance Agent exchanged token with Legal agent for: %s", purpose)
                 return exchanged_token
             except Exception as e:
-                logger.error(f"Token exchange with Legal agent failed: {e}")
+                logger.error("Token exchange with Legal agent failed: %s", e)
                 # Fallback to simulated token for demo purposes
-                return f"finance-to-legal-token-{purpose}-{datetime.now().timestamp()}"
+                return f"finance-to-legal-token-{purpose}-{time.time_ns()}"
         else:
             # Fallback to simulated token if okta_auth not available
             logger.warning("OktaAuth not available, using simulated token exchange")
-            return f"finance-to-legal-token-{purpose}-{datetime.now().timestamp()}"
+            return f"finance-to-legal-token-{purpose}-{time.time_ns()}"
 
     async def receive_token_from_agent(self, from_agent: str, token: str, purpose: str) -> Dict[str, Any]:
         """Receive token from another agent (internal use - token not returned for security)"""
-        logger.info(f"Finance Agent received token from {from_agent} for {purpose}")
+        logger.info("Finance Agent received token from %s for %s", from_agent, purpose)
         
         # Security: Don't return actual token in response - it's used internally only
         return {
@@ -491,11 +562,16 @@ Always maintain detailed audit trails and coordinate with other agents as needed
             "from_agent": from_agent,
             "purpose": purpose,
             # Token removed - used internally, not returned
-            "processed_at": datetime.now().isoformat()
+            "processed_at": iso_now()
         }
 
+    def _record_transaction(self, transaction: Dict[str, Any]) -> None:
+        """Store a transaction and index it by employee"""
+        self.transactions[transaction["id"]] = transaction
+        self._transactions_by_employee.setdefault(transaction["employee_id"], []).append(transaction["id"])
+
     def get_transaction_history(self, employee_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get transaction history"""
         if employee_id:
-            return [txn for txn in self.transactions.values() if txn.get("employee_id") == employee_id]
+            return [self.transactions[txn_id] for txn_id in self._transactions_by_employee.get(employee_id, [])]
         return list(self.transactions.values())
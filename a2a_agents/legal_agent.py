@@ -1,31 +1,187 @@
 import logging
 import os
 import hashlib
-from typing import Dict, Any, Optional
-from datetime import datetime
-import json
+import functools
+import copy
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
 import asyncio
 
 from langchain.schema import HumanMessage, AIMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from auth.okta_scopes import OKTA_SCOPES, get_cross_agent_scope
+from a2a_agents.common import (
+    ALLOW_PII_IN_LLM_PROMPTS,
+    TokenExchangeCache,
+    anonymous_id,
+    error_result,
+    get_openai_http_client,
+    prompt_json,
+    returns_error_result,
+)
+from utils.timestamps import iso_now
 
 logger = logging.getLogger(__name__)
 
+# OpenAI prompt caching matches on the longest shared prefix, so the system prompt must stay
+# the first message and unchanged; all per-request data goes in the HumanMessage after it
+PROMPT_CACHE_KEY = "streamward-legal-agent"
+# Set ENABLE_LLM_PROMPT_CACHE=false for OpenAI-compatible endpoints that reject the prompt_cache_key parameter
+ENABLE_LLM_PROMPT_CACHE = os.getenv("ENABLE_LLM_PROMPT_CACHE", "true").lower() == "true"
+
+_llm: Optional[ChatOpenAI] = None
+
+def _get_llm() -> ChatOpenAI:
+    """
+    Shared ChatOpenAI for all LegalAgent instances, created on first use.
+    Uses the process-wide OpenAI HTTP/2 client shared with the other agents.
+    """
+    global _llm
+    if _llm is None:
+        _llm = ChatOpenAI(
+            model="gpt-4o-mini",
+            temperature=0.3,
+            max_tokens=GENERAL_TASK_MAX_TOKENS,
+            # Route every Legal request to the same OpenAI prompt cache so the static
+            # system prompt prefix is reused across calls
+            model_kwargs={"prompt_cache_key": PROMPT_CACHE_KEY} if ENABLE_LLM_PROMPT_CACHE else {},
+            http_async_client=get_openai_http_client()
+        )
+    return _llm
+
+# Static legal check lists (shared across calls; copied into responses where needed)
+ONBOARDING_LEGAL_CHECKS = (
+    "Employment contract compliance",
+    "Non-disclosure agreement verification",
+    "Background check compliance",
+    "Right-to-work verification",
+    "Department-specific legal requirements",
+    "Data privacy compliance (GDPR, CCPA)",
+    "Intellectual property assignment"
+)
+
+ONBOARDING_LEGAL_DOCUMENTS = (
+    "Employment Agreement",
+    "Non-Disclosure Agreement",
+    "Intellectual Property Assignment",
+    "Data Privacy Consent"
+)
+
+ONBOARDING_NEXT_STEPS = (
+    "HR agent will complete employment setup",
+    "Finance agent will process payroll setup",
+    "Legal documents will be sent for signature"
+)
+
+EXPENSE_LEGAL_CHECKS = (
+    "Expense policy compliance verification",
+    "Tax compliance for expense category",
+    "Regulatory requirement verification",
+    "Anti-corruption policy compliance",
+    "Documentation requirement verification"
+)
+
+AUDIT_COMPLIANCE_CHECKS = (
+    "SOX compliance verification",
+    "GDPR compliance assessment",
+    "CCPA compliance verification",
+    "Employment law compliance",
+    "Contract compliance verification",
+    "Intellectual property compliance",
+    "Data privacy compliance",
+    "Anti-corruption compliance"
+)
+
+AUDIT_RECOMMENDATIONS = (
+    "Update data privacy policies",
+    "Review employment contracts",
+    "Enhance compliance monitoring",
+    "Schedule regular compliance training"
+)
+
+AUDIT_RISK_FACTORS = (
+    "Data privacy regulations",
+    "Employment law changes",
+    "Contractual obligations",
+    "Regulatory updates"
+)
+
+# Fixed notes that follow the per-request notes in expense and benefits responses
+EXPENSE_LEGAL_NOTES = (
+    "All required documentation is in order",
+)
+
+BENEFITS_LEGAL_NOTES = (
+    "All regulatory requirements are met",
+    "No legal risks identified"
+)
+
+# Benefits verification steps after the per-request "Verify legal compliance for ..." step
+BENEFITS_LEGAL_TASKS = (
+    "Review employment contract implications",
+    "Check regulatory compliance requirements",
+    "Validate benefit provider agreements",
+    "Assess legal risk factors"
+)
+
+# Output cap for general-task summaries (well above a typical 200-300 token reply); decode time
+# scales with output length, so this bounds the worst case. General tasks are the only LLM use here.
+GENERAL_TASK_MAX_TOKENS = 400
+
+# Result dicts for the fixed checks (every simulated check passes); handlers return copies
+ONBOARDING_COMPLIANCE_RESULTS = dict.fromkeys(ONBOARDING_LEGAL_CHECKS, "verified")
+EXPENSE_COMPLIANCE_RESULTS = dict.fromkeys(EXPENSE_LEGAL_CHECKS, "compliant")
+AUDIT_RESULTS = dict.fromkeys(AUDIT_COMPLIANCE_CHECKS, "compliant")
+BENEFITS_VERIFICATION_RESULTS = dict.fromkeys(BENEFITS_LEGAL_TASKS, "verified")
+
+# Parameter count above which the general-task prompt is rendered in a worker thread
+PROMPT_OFFLOAD_MIN_PARAMETERS = 10
+
+# Demo-only: add artificial processing delay (off by default so production pays no dead latency)
+SIMULATE_LATENCY = os.getenv("LEGAL_AGENT_SIMULATE_LATENCY", "0") == "1"
+
+# Completed results for requests that carry a parameters["request_id"], so retries are answered directly
+REPLAY_CACHE_SIZE = 1024
+REPLAY_CACHE_TTL = 300
+
+# Exact-match cache of general-task LLM replies, keyed on the rendered prompt
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_TTL = 600
+
 class LegalAgent:
     """
     Legal A2A Agent for compliance verification and legal tasks
     Handles token exchange with other agents and legal compliance checks
     """
     
+    # Fixed attribute set: no per-instance __dict__, and attribute access on the hot path is a slot read
+    __slots__ = (
+        "okta_auth",
+        "system_prompt",
+        "compliance_records",
+        "_system_message",
+        "_token_exchanges",
+        "_response_cache",
+        "_inflight_responses",
+        "_compliance_records_by_type",
+        "_replay_cache",
+    )
+    
+    # workflow_type -> handler method name; anything else goes to _handle_general_legal_task
+    _WORKFLOW_HANDLERS = {
+        "employee_onboarding": "_handle_employee_onboarding_legal",
+        "expense_approval": "_handle_expense_approval_legal",
+        "compliance_audit": "_handle_compliance_audit",
+        "benefits_change": "_handle_benefits_change_legal",
+    }
+    
     def __init__(self, okta_auth=None):
-        self.llm = ChatOpenAI(
-            model="gpt-4",
-            temperature=0.3,
-            max_tokens=1000
-        )
         self.okta_auth = okta_auth
         
+        # Token exchanges made with the Legal service app credentials, reused until near expiry
+        self._token_exchanges = TokenExchangeCache("legal")
+        
         self.system_prompt = """
 You are the Legal A2A Agent for Streamward Corporation. Your responsibilities include:
 
@@ -38,6 +194,14 @@ You are the Legal A2A Agent for Streamward Corporation. Your responsibilities in
 You receive requests from the Orchestrator Agent and coordinate with HR and Finance agents as needed.
 Always maintain legal accuracy and provide detailed compliance assessments.
 """
+        self._system_message = SystemMessage(content=self.system_prompt)
+        
+        # blake2b(prompt) -> (response content, monotonic expiry), least recently used first
+        self._response_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        # (workflow_type, request_id, token digest) -> (completed result, monotonic expiry), least recently used first
+        self._replay_cache: "OrderedDict[tuple, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        # blake2b(prompt) -> LLM call currently in flight for that prompt
+        self._inflight_responses: Dict[str, "asyncio.Future[str]"] = {}
         
         # Mock legal data
         self.compliance_records = {
@@ -56,272 +220,199 @@ Always maintain legal accuracy and provide detailed compliance assessments.
                 "next_review": "2024-07-15"
             }
         }
+        
+        # Secondary index: compliance type -> {record id: record}
+        self._compliance_records_by_type: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for record_id, record in self.compliance_records.items():
+            self._compliance_records_by_type.setdefault(record["type"], {})[record_id] = record
 
+    @property
+    def llm(self) -> ChatOpenAI:
+        """Shared LLM client, created on first use so token-exchange and compliance lookups never pay for it"""
+        return _get_llm()
+
+    @returns_error_result("Legal Agent error", "Legal Agent encountered an error")
     async def process_workflow_task(self, workflow_type: str, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> Dict[str, Any]:
         """
         Process Legal workflow tasks with token exchange capabilities
         """
-        try:
-            logger.info(f"Legal Agent processing workflow: {workflow_type}")
-            
-            if workflow_type == "employee_onboarding":
-                return await self._handle_employee_onboarding_legal(parameters, user_info, token)
-            elif workflow_type == "expense_approval":
-                return await self._handle_expense_approval_legal(parameters, user_info, token)
-            elif workflow_type == "compliance_audit":
-                return await self._handle_compliance_audit(parameters, user_info, token)
-            elif workflow_type == "benefits_change":
-                return await self._handle_benefits_change_legal(parameters, user_info, token)
-            else:
-                return await self._handle_general_legal_task(workflow_type, parameters, user_info, token)
-                
-        except Exception as e:
-            logger.error(f"Legal Agent error: {e}")
-            return {
-                "status": "error",
-                "summary": f"Legal Agent encountered an error: {str(e)}",
-                "error": str(e)
-            }
+        logger.info("Legal Agent processing workflow: %s", workflow_type)
+        
+        # Replays of the same request (e.g. orchestrator retries) return the earlier result
+        replay_key = self._replay_key(workflow_type, parameters, token)
+        if replay_key is not None:
+            cached = self._replay_cache.get(replay_key)
+            if cached and cached[1] > time.monotonic():
+                self._replay_cache.move_to_end(replay_key)
+                return copy.deepcopy(cached[0])
+        
+        handler_name = self._WORKFLOW_HANDLERS.get(workflow_type)
+        if handler_name:
+            result = await getattr(self, handler_name)(parameters, user_info, token)
+        else:
+            result = await self._handle_general_legal_task(workflow_type, parameters, user_info, token)
+        
+        if replay_key is not None and result.get("status") == "completed":
+            self._replay_cache[replay_key] = (copy.deepcopy(result), time.monotonic() + REPLAY_CACHE_TTL)
+            self._replay_cache.move_to_end(replay_key)
+            if len(self._replay_cache) > REPLAY_CACHE_SIZE:
+                self._replay_cache.popitem(last=False)
+        return result
+
+    def _replay_key(self, workflow_type: str, parameters: Dict[str, Any], token: str) -> Optional[tuple]:
+        """
+        Cache key for a request that carries a request_id, or None if it has none.
+        The caller's token is part of the key so a request_id can't replay another user's result.
+        """
+        request_id = parameters.get("request_id")
+        if not request_id or not isinstance(request_id, str):
+            return None
+        token_digest = hashlib.sha256((token or "").encode()).digest()[:16]
+        return (workflow_type, request_id, token_digest)
 
+    @returns_error_result("Employee onboarding legal error", "Legal onboarding failed")
     async def _handle_employee_onboarding_legal(self, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> Dict[str, Any]:
         """Handle legal aspects of employee onboarding"""
-        try:
-            employee_name = parameters.get("employee_name", "New Employee")
-            department = parameters.get("department", "Unknown")
-            position = parameters.get("position", "Employee")
-            
-            # Exchange token with HR agent for employee verification
-            hr_token = await self._exchange_token_with_hr(token, "employee_verification")
-            
-            # Exchange token with Finance agent for financial compliance
-            finance_token = await self._exchange_token_with_finance(token, "financial_compliance")
-            
-            # Legal compliance checks
-            legal_checks = [
-                "Employment contract compliance",
-                "Non-disclosure agreement verification",
-                "Background check compliance",
-                "Right-to-work verification",
-                "Department-specific legal requirements",
-                "Data privacy compliance (GDPR, CCPA)",
-                "Intellectual property assignment"
-            ]
-            
-            # Process legal verification
-            compliance_results = {}
-            for check in legal_checks:
-                await asyncio.sleep(0.1)  # Simulate processing
-                compliance_results[check] = "verified"
-            
-            # Generate legal documents
-            legal_documents = [
-                "Employment Agreement",
-                "Non-Disclosure Agreement",
-                "Intellectual Property Assignment",
-                "Data Privacy Consent"
-            ]
-            
-            return {
-                "status": "completed",
-                "summary": f"Legal onboarding completed for {employee_name}",
-                "compliance_results": compliance_results,
-                "legal_documents": legal_documents,
-                "token_exchanges": {
-                    "hr_token": hr_token,
-                    "finance_token": finance_token
-                },
-                "next_steps": [
-                    "HR agent will complete employment setup",
-                    "Finance agent will process payroll setup",
-                    "Legal documents will be sent for signature"
-                ],
-                "compliance_score": "100%"
-            }
-            
-        except Exception as e:
-            logger.error(f"Employee onboarding legal error: {e}")
-            return {
-                "status": "error",
-                "summary": f"Legal onboarding failed: {str(e)}",
-                "error": str(e)
-            }
+        employee_name = parameters.get("employee_name", "New Employee")
+        department = parameters.get("department", "Unknown")
+        position = parameters.get("position", "Employee")
+        
+        # Exchange tokens with HR and Finance (employee verification, financial compliance) concurrently
+        hr_token, finance_token = await asyncio.gather(
+            self._exchange_token_with_hr(token, "employee_verification"),
+            self._exchange_token_with_finance(token, "financial_compliance")
+        )
+        
+        # Process legal verification (checks are independent, so simulate them as one step)
+        compliance_results = ONBOARDING_COMPLIANCE_RESULTS.copy()
+        if SIMULATE_LATENCY:
+            await asyncio.sleep(0.1)  # Simulate processing
+        
+        return {
+            "status": "completed",
+            "summary": f"Legal onboarding completed for {employee_name}",
+            "compliance_results": compliance_results,
+            "legal_documents": list(ONBOARDING_LEGAL_DOCUMENTS),
+            "token_exchanges": {
+                "hr_token": hr_token,
+                "finance_token": finance_token
+            },
+            "next_steps": list(ONBOARDING_NEXT_STEPS),
+            "compliance_score": "100%"
+        }
 
+    @returns_error_result("Expense approval legal error", "Legal expense verification failed")
     async def _handle_expense_approval_legal(self, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> Dict[str, Any]:
         """Handle legal aspects of expense approval"""
-        try:
-            amount = parameters.get("amount", 0)
-            employee_id = parameters.get("employee_id", "unknown")
-            category = parameters.get("category", "other")
-            description = parameters.get("description", "")
-            
-            # Exchange token with HR agent for employee verification
-            hr_token = await self._exchange_token_with_hr(token, "employee_verification")
-            
-            # Exchange token with Finance agent for financial compliance
-            finance_token = await self._exchange_token_with_finance(token, "expense_compliance")
-            
-            # Legal compliance checks
-            legal_checks = [
-                "Expense policy compliance verification",
-                "Tax compliance for expense category",
-                "Regulatory requirement verification",
-                "Anti-corruption policy compliance",
-                "Documentation requirement verification"
+        amount = parameters.get("amount", 0)
+        employee_id = parameters.get("employee_id", "unknown")
+        category = parameters.get("category", "other")
+        description = parameters.get("description", "")
+        
+        # Exchange tokens with HR and Finance (employee verification, expense compliance) concurrently
+        hr_token, finance_token = await asyncio.gather(
+            self._exchange_token_with_hr(token, "employee_verification"),
+            self._exchange_token_with_finance(token, "expense_compliance")
+        )
+        
+        # Process legal verification (checks are independent, so simulate them as one step)
+        compliance_results = EXPENSE_COMPLIANCE_RESULTS.copy()
+        if SIMULATE_LATENCY:
+            await asyncio.sleep(0.1)  # Simulate processing
+        
+        # Risk assessment
+        risk_level = "low"
+        if amount > 5000:
+            risk_level = "medium"
+        if amount > 10000:
+            risk_level = "high"
+        
+        amount_display = f"${amount:,.2f}"
+        
+        return {
+            "status": "completed",
+            "summary": f"Legal expense verification completed: {amount_display}",
+            "compliance_results": compliance_results,
+            "risk_level": risk_level,
+            "legal_recommendation": "approve" if risk_level == "low" else "review_required",
+            "token_exchanges": {
+                "hr_token": hr_token,
+                "finance_token": finance_token
+            },
+            "legal_notes": [
+                f"Expense category '{category}' is compliant with company policy",
+                f"Amount {amount_display} is within approved limits",
+                *EXPENSE_LEGAL_NOTES
             ]
-            
-            # Process legal verification
-            compliance_results = {}
-            for check in legal_checks:
-                await asyncio.sleep(0.1)  # Simulate processing
-                compliance_results[check] = "compliant"
-            
-            # Risk assessment
-            risk_level = "low"
-            if amount > 5000:
-                risk_level = "medium"
-            if amount > 10000:
-                risk_level = "high"
-            
-            return {
-                "status": "completed",
-                "summary": f"Legal expense verification completed: ${amount:,.2f}",
-                "compliance_results": compliance_results,
-                "risk_level": risk_level,
-                "legal_recommendation": "approve" if risk_level == "low" else "review_required",
-                "token_exchanges": {
-                    "hr_token": hr_token,
-                    "finance_token": finance_token
-                },
-                "legal_notes": [
-                    f"Expense category '{category}' is compliant with company policy",
-                    f"Amount ${amount:,.2f} is within approved limits",
-                    "All required documentation is in order"
-                ]
-            }
-            
-        except Exception as e:
-            logger.error(f"Expense approval legal error: {e}")
-            return {
-                "status": "error",
-                "summary": f"Legal expense verification failed: {str(e)}",
-                "error": str(e)
-            }
+        }
 
+    @returns_error_result("Compliance audit legal error", "Legal compliance audit failed")
     async def _handle_compliance_audit(self, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> Dict[str, Any]:
         """Handle legal compliance audit"""
-        try:
-            audit_scope = parameters.get("audit_scope", "general")
-            
-            # Exchange tokens with other agents for comprehensive audit
-            hr_token = await self._exchange_token_with_hr(token, "hr_audit_coordination")
-            finance_token = await self._exchange_token_with_finance(token, "finance_audit_coordination")
-            
-            # Legal compliance checks
-            compliance_checks = [
-                "SOX compliance verification",
-                "GDPR compliance assessment",
-                "CCPA compliance verification",
-                "Employment law compliance",
-                "Contract compliance verification",
-                "Intellectual property compliance",
-                "Data privacy compliance",
-                "Anti-corruption compliance"
-            ]
-            
-            # Simulate audit process
-            audit_results = {}
-            for check in compliance_checks:
-                await asyncio.sleep(0.1)  # Simulate processing
-                audit_results[check] = "compliant"
-            
-            # Risk assessment
-            risk_factors = [
-                "Data privacy regulations",
-                "Employment law changes",
-                "Contractual obligations",
-                "Regulatory updates"
-            ]
-            
-            return {
-                "status": "completed",
-                "summary": "Legal compliance audit completed successfully",
-                "audit_results": audit_results,
-                "compliance_score": "97%",
-                "risk_factors": risk_factors,
-                "token_exchanges": {
-                    "hr_token": hr_token,
-                    "finance_token": finance_token
-                },
-                "recommendations": [
-                    "Update data privacy policies",
-                    "Review employment contracts",
-                    "Enhance compliance monitoring",
-                    "Schedule regular compliance training"
-                ],
-                "next_review_date": "2024-07-01"
-            }
-            
-        except Exception as e:
-            logger.error(f"Compliance audit legal error: {e}")
-            return {
-                "status": "error",
-                "summary": f"Legal compliance audit failed: {str(e)}",
-                "error": str(e)
-            }
+        audit_scope = parameters.get("audit_scope", "general")
+        
+        # Exchange tokens with HR and Finance (audit coordination) concurrently
+        hr_token, finance_token = await asyncio.gather(
+            self._exchange_token_with_hr(token, "hr_audit_coordination"),
+            self._exchange_token_with_finance(token, "finance_audit_coordination")
+        )
+        
+        # Simulate audit process (checks are independent, so simulate them as one step)
+        audit_results = AUDIT_RESULTS.copy()
+        if SIMULATE_LATENCY:
+            await asyncio.sleep(0.1)  # Simulate processing
+        
+        return {
+            "status": "completed",
+            "summary": "Legal compliance audit completed successfully",
+            "audit_results": audit_results,
+            "compliance_score": "97%",
+            "risk_factors": list(AUDIT_RISK_FACTORS),
+            "token_exchanges": {
+                "hr_token": hr_token,
+                "finance_token": finance_token
+            },
+            "recommendations": list(AUDIT_RECOMMENDATIONS),
+            "next_review_date": "2024-07-01"
+        }
 
+    @returns_error_result("Benefits change legal error", "Legal benefits change verification failed")
     async def _handle_benefits_change_legal(self, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> Dict[str, Any]:
         """Handle legal aspects of benefits changes"""
-        try:
-            employee_id = parameters.get("employee_id", "unknown")
-            benefit_type = parameters.get("benefit_type", "unknown")
-            change_type = parameters.get("change_type", "modify")
-            
-            # Exchange token with HR agent
-            hr_token = await self._exchange_token_with_hr(token, "benefits_coordination")
-            
-            # Exchange token with Finance agent
-            finance_token = await self._exchange_token_with_finance(token, "benefits_financial")
-            
-            # Legal verification tasks
-            legal_tasks = [
-                f"Verify legal compliance for {change_type} {benefit_type}",
-                "Review employment contract implications",
-                "Check regulatory compliance requirements",
-                "Validate benefit provider agreements",
-                "Assess legal risk factors"
+        employee_id = parameters.get("employee_id", "unknown")
+        benefit_type = parameters.get("benefit_type", "unknown")
+        change_type = parameters.get("change_type", "modify")
+        
+        # Exchange tokens with HR and Finance (benefits coordination) concurrently
+        hr_token, finance_token = await asyncio.gather(
+            self._exchange_token_with_hr(token, "benefits_coordination"),
+            self._exchange_token_with_finance(token, "benefits_financial")
+        )
+        
+        # Process legal verification (tasks are independent, so simulate them as one step)
+        verification_results = {
+            f"Verify legal compliance for {change_type} {benefit_type}": "verified",
+            **BENEFITS_VERIFICATION_RESULTS
+        }
+        if SIMULATE_LATENCY:
+            await asyncio.sleep(0.1)  # Simulate processing
+        
+        return {
+            "status": "completed",
+            "summary": f"Legal benefits {change_type} verification completed",
+            "benefit_type": benefit_type,
+            "change_type": change_type,
+            "verification_results": verification_results,
+            "legal_recommendation": "proceed",
+            "token_exchanges": {
+                "hr_token": hr_token,
+                "finance_token": finance_token
+            },
+            "legal_notes": [
+                f"{change_type.title()} of {benefit_type} is legally compliant",
+                *BENEFITS_LEGAL_NOTES
             ]
-            
-            # Process legal verification
-            verification_results = {}
-            for task in legal_tasks:
-                await asyncio.sleep(0.1)  # Simulate processing
-                verification_results[task] = "verified"
-            
-            return {
-                "status": "completed",
-                "summary": f"Legal benefits {change_type} verification completed",
-                "benefit_type": benefit_type,
-                "change_type": change_type,
-                "verification_results": verification_results,
-                "legal_recommendation": "proceed",
-                "token_exchanges": {
-                    "hr_token": hr_token,
-                    "finance_token": finance_token
-                },
-                "legal_notes": [
-                    f"{change_type.title()} of {benefit_type} is legally compliant",
-                    "All regulatory requirements are met",
-                    "No legal risks identified"
-                ]
-            }
-            
-        except Exception as e:
-            logger.error(f"Benefits change legal error: {e}")
-            return {
-                "status": "error",
-                "summary": f"Legal benefits change verification failed: {str(e)}",
-                "error": str(e)
-            }
+        }
 
     def _sanitize_user_info_for_llm(self, user_info: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -333,9 +424,7 @@ Always maintain legal accuracy and provide detailed compliance assessments.
         minimal = {}
         
         # Privacy setting: Check if PII is allowed
-        allow_pii = os.getenv("ALLOW_PII_IN_LLM_PROMPTS", "false").lower() == "true"
-        
-        if allow_pii:
+        if ALLOW_PII_IN_LLM_PROMPTS:
             # Privacy Level 3: Include email/name
             if user_info.get("email"):
                 minimal["email"] = user_info["email"]
@@ -344,50 +433,173 @@ Always maintain legal accuracy and provide detailed compliance assessments.
         else:
             # Privacy Level 1: Anonymous ID only
             email = user_info.get("email", "anonymous")
-            salt = os.getenv("ANONYMOUS_ID_SALT", "streamward-privacy-salt")
-            anonymous_id = hashlib.sha256(f"{email}{salt}".encode()).hexdigest()[:16]
-            minimal["user_id"] = f"user_{anonymous_id}"
+            minimal["user_id"] = f"user_{anonymous_id(email)}"
         return minimal
     
-    async def _handle_general_legal_task(self, workflow_type: str, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> Dict[str, Any]:
-        """Handle general legal tasks"""
-        try:
-            # Sanitize user_info before sending to LLM (security)
-            safe_user_info = self._sanitize_user_info_for_llm(user_info)
-            
-            # Use LLM to process general legal requests
-            prompt = f"""
+    def _build_general_legal_prompt(self, workflow_type: str, parameters: Dict[str, Any], user_info: Dict[str, Any]) -> str:
+        """Render the LLM prompt for a general legal task"""
+        # Sanitize user_info before sending to LLM (security)
+        safe_user_info = self._sanitize_user_info_for_llm(user_info)
+        
+        # Use LLM to process general legal requests
+        return f"""
             Process this Legal workflow task:
             
             Workflow Type: {workflow_type}
-            Parameters: {json.dumps(parameters, indent=2)}
-            User Info: {json.dumps(safe_user_info, indent=2)}
+            Parameters: {prompt_json(parameters)}
+            User Info: {prompt_json(safe_user_info)}
             
             Provide a summary of legal actions taken and compliance recommendations.
             Focus on regulatory compliance and risk assessment.
             """
-            
-            messages = [
-                SystemMessage(content=self.system_prompt),
-                HumanMessage(content=prompt)
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            
-            return {
-                "status": "completed",
-                "summary": response.content,
-                "workflow_type": workflow_type,
-                "legal_actions": ["General legal processing completed"]
-            }
-            
+
+    async def _render_general_legal_prompt(self, workflow_type: str, parameters: Dict[str, Any], user_info: Dict[str, Any]) -> str:
+        """
+        Render the general-task prompt, off the event loop when the parameters are large enough
+        that serializing them would stall other coroutines (a thread hop costs more for small ones)
+        """
+        if len(parameters) > PROMPT_OFFLOAD_MIN_PARAMETERS:
+            return await asyncio.to_thread(self._build_general_legal_prompt, workflow_type, parameters, user_info)
+        return self._build_general_legal_prompt(workflow_type, parameters, user_info)
+
+    def _response_cache_key(self, prompt: str) -> str:
+        """Cache key for an LLM reply (the prompt embeds only the anonymized user info, so identical prompts are safe to share)"""
+        return hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+
+    def _get_cached_response(self, cache_key: str) -> Optional[str]:
+        """Return a cached LLM reply if it has not expired"""
+        cached = self._response_cache.get(cache_key)
+        if cached and cached[1] > time.monotonic():
+            self._response_cache.move_to_end(cache_key)
+            return cached[0]
+        return None
+
+    def _cache_response(self, cache_key: str, content: str) -> None:
+        """Store an LLM reply, evicting the least recently used entry when full"""
+        self._response_cache[cache_key] = (content, time.monotonic() + RESPONSE_CACHE_TTL)
+        self._response_cache.move_to_end(cache_key)
+        if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+
+    def _general_legal_result(self, workflow_type: str, summary: str) -> Dict[str, Any]:
+        """Build the result for a completed general legal task"""
+        return {
+            "status": "completed",
+            "summary": summary,
+            "workflow_type": workflow_type,
+            "legal_actions": ["General legal processing completed"]
+        }
+
+    def _general_legal_error(self, e: Exception) -> Dict[str, Any]:
+        """Log and build the error result for a failed general legal task"""
+        return error_result("General legal task error", "General legal task failed", e)
+
+    @returns_error_result("General legal task error", "General legal task failed")
+    async def _handle_general_legal_task(self, workflow_type: str, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> Dict[str, Any]:
+        """Handle general legal tasks"""
+        prompt = await self._render_general_legal_prompt(workflow_type, parameters, user_info)
+        cache_key = self._response_cache_key(prompt)
+        summary = self._get_cached_response(cache_key)
+        if summary is None:
+            # Concurrent identical prompts share one in-flight LLM call instead of each paying for it
+            task = self._inflight_responses.get(cache_key)
+            if task is None:
+                task = asyncio.ensure_future(self._complete_general_prompt(cache_key, prompt))
+                self._inflight_responses[cache_key] = task
+                task.add_done_callback(functools.partial(self._forget_inflight_response, cache_key))
+            summary = await asyncio.shield(task)
+        
+        return self._general_legal_result(workflow_type, summary)
+
+    async def _complete_general_prompt(self, cache_key: str, prompt: str) -> str:
+        """Run one general-task LLM call and cache its reply"""
+        messages = [
+            self._system_message,
+            HumanMessage(content=prompt)
+        ]
+        response = await self.llm.ainvoke(messages)
+        self._cache_response(cache_key, response.content)
+        return response.content
+
+    def _forget_inflight_response(self, cache_key: str, task: "asyncio.Future[str]") -> None:
+        """Drop a finished in-flight call (marking its exception retrieved if every waiter was cancelled)"""
+        self._inflight_responses.pop(cache_key, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def stream_general_legal_task(self, workflow_type: str, parameters: Dict[str, Any], user_info: Dict[str, Any], token: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of _handle_general_legal_task for callers that can render partial output.
+        Yields {"status": "in_progress", "delta": ...} dicts as tokens arrive, then the same final
+        result (or error result) the non-streaming handler returns.
+        """
+        try:
+            prompt = await self._render_general_legal_prompt(workflow_type, parameters, user_info)
+            cache_key = self._response_cache_key(prompt)
+            summary = self._get_cached_response(cache_key)
+            if summary is None:
+                messages = [
+                    self._system_message,
+                    HumanMessage(content=prompt)
+                ]
+                parts = []
+                async for chunk in self.llm.astream(messages):
+                    if chunk.content:
+                        parts.append(chunk.content)
+                        yield {"status": "in_progress", "workflow_type": workflow_type, "delta": chunk.content}
+                summary = "".join(parts)
+                self._cache_response(cache_key, summary)
         except Exception as e:
-            logger.error(f"General legal task error: {e}")
-            return {
-                "status": "error",
-                "summary": f"General legal task failed: {str(e)}",
-                "error": str(e)
-            }
+            yield self._general_legal_error(e)
+            return
+        
+        yield self._general_legal_result(workflow_type, summary)
+
+    async def process_workflow_batch(self, tasks: List[Tuple[str, Dict[str, Any], Dict[str, Any], str]]) -> List[Dict[str, Any]]:
+        """
+        Process several (workflow_type, parameters, user_info, token) tasks at once.
+        Tasks with a dedicated handler run concurrently; uncached general legal tasks share a
+        single llm.abatch call instead of one LLM round-trip each. Results are returned in input order.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+        handler_indices, handler_calls = [], []
+        general_indices, general_keys, general_messages = [], [], []
+        
+        for i, (workflow_type, parameters, user_info, token) in enumerate(tasks):
+            if workflow_type in self._WORKFLOW_HANDLERS:
+                handler_indices.append(i)
+                handler_calls.append(self.process_workflow_task(workflow_type, parameters, user_info, token))
+                continue
+            try:
+                prompt = self._build_general_legal_prompt(workflow_type, parameters, user_info)
+            except Exception as e:
+                results[i] = self._general_legal_error(e)
+                continue
+            cache_key = self._response_cache_key(prompt)
+            summary = self._get_cached_response(cache_key)
+            if summary is not None:
+                results[i] = self._general_legal_result(workflow_type, summary)
+                continue
+            general_indices.append(i)
+            general_keys.append(cache_key)
+            general_messages.append([self._system_message, HumanMessage(content=prompt)])
+        
+        async def run_general() -> List[Any]:
+            if not general_messages:
+                return []
+            return await self.llm.abatch(general_messages, config={"max_concurrency": 10}, return_exceptions=True)
+        
+        handler_results, general_responses = await asyncio.gather(asyncio.gather(*handler_calls), run_general())
+        
+        for i, result in zip(handler_indices, handler_results):
+            results[i] = result
+        for i, cache_key, response in zip(general_indices, general_keys, general_responses):
+            if isinstance(response, Exception):
+                results[i] = self._general_legal_error(response)
+            else:
+                self._cache_response(cache_key, response.content)
+                results[i] = self._general_legal_result(tasks[i][0], response.content)
+        return results
 
     async def _exchange_token_with_hr(self, current_token: str, purpose: str) -> str:
         """Exchange token with HR agent using RFC 8693 Token Exchange"""
@@ -395,22 +607,22 @@ Always maintain legal accuracy and provide detailed compliance assessments.
             try:
                 # Exchange to HR server - must request HR scopes (not Legal scopes!)
                 # HR server only has HR scopes
-                exchanged_token = await self.okta_auth.exchange_token(
-                    token=current_token,
+                exchanged_token = await self._token_exchanges.exchange(
+                    self.okta_auth,
+                    current_token,
                     target_audience=self.okta_auth.hr_audience,
                     scope=get_cross_agent_scope("legal", "hr"),  # HR server scope
-                    source_agent="legal"  # Use Legal service app credentials
                 )
-                logger.info(f"Legal Agent exchanged token with HR agent for: {purpose}")
+                logger.info("Legal Agent exchanged token with HR agent for: %s", purpose)
                 return exchanged_token
             except Exception as e:
-                logger.error(f"Token exchange with HR agent failed: {e}")
+                logger.error("Token exchange with HR agent failed: %s", e)
                 # Fallback to simulated token for demo purposes
-                return f"legal-to-hr-token-{purpose}-{datetime.now().timestamp()}"
+                return f"legal-to-hr-token-{purpose}-{time.time_ns()}"
         else:
             # Fallback to simulated token if okta_auth not available
             logger.warning("OktaAuth not available, using simulated token exchange")
-            return f"legal-to-hr-token-{purpose}-{datetime.now().timestamp()}"
+            return f"legal-to-hr-token-{purpose}-{time.time_ns()}"
 
     async def _exchange_token_with_finance(self, current_token: str, purpose: str) -> str:
         """Exchange token with Finance agent using RFC 8693 Token Exchange"""
@@ -418,26 +630,26 @@ Always maintain legal accuracy and provide detailed compliance assessments.
             try:
                 # Exchange to Finance server - must request Finance scopes (not Legal scopes!)
                 # Finance server only has Finance scopes
-                exchanged_token = await self.okta_auth.exchange_token(
-                    token=current_token,
+                exchanged_token = await self._token_exchanges.exchange(
+                    self.okta_auth,
+                    current_token,
                     target_audience=self.okta_auth.finance_audience,
                     scope=get_cross_agent_scope("legal", "finance"),  # Finance server scope
-                    source_agent="legal"  # Use Legal service app credentials
                 )
-                logger.info(f"Legal Agent exchanged token with Finance agent for: {purpose}")
+                logger.info("Legal Agent exchanged token with Finance agent for: %s", purpose)
                 return exchanged_token
             except Exception as e:
-                logger.error(f"Token exchange with Finance agent failed: {e}")
+                logger.error("Token exchange with Finance agent failed: %s", e)
                 # Fallback to simulated token for demo purposes
-                return f"legal-to-finance-token-{purpose}-{datetime.now().timestamp()}"
+                return f"legal-to-finance-token-{purpose}-{time.time_ns()}"
         else:
             # Fallback to simulated token if okta_auth not available
             logger.warning("OktaAuth not available, using simulated token exchange")
-            return f"legal-to-finance-token-{purpose}-{datetime.now().timestamp()}"
+            return f"legal-to-finance-token-{purpose}-{time.time_ns()}"
 
     async def receive_token_from_agent(self, from_agent: str, token: str, purpose: str) -> Dict[str, Any]:
         """Receive token from another agent (internal use - token not returned for security)"""
-        logger.info(f"Legal Agent received token from {from_agent} for {purpose}")
+        logger.info("Legal Agent received token from %s for %s", from_agent, purpose)
         
         # Security: Don't return actual token in response - it's used internally only
         return {
@@ -445,11 +657,11 @@ Always maintain legal accuracy and provide detailed compliance assessments.
             "from_agent": from_agent,
             "purpose": purpose,
             # Token removed - used internally, not returned
-            "processed_at": datetime.now().isoformat()
+            "processed_at": iso_now()
         }
 
     def get_compliance_status(self, compliance_type: Optional[str] = None) -> Dict[str, Any]:
         """Get compliance status"""
         if compliance_type:
-            return {k: v for k, v in self.compliance_records.items() if v["type"] == compliance_type}
+            return self._compliance_records_by_type.get(compliance_type, {})
         return self.compliance_records
@@ -1,12 +1,19 @@
 from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
-import json
+import copy
+import hashlib
 import logging
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime
 import os
+import orjson
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -15,7 +22,9 @@ load_dotenv()
 # Import our modules
 from chat_assistant.assistant import StreamwardAssistant
 from api.routes.documents import router as documents_router
-from auth.okta_validator import get_current_user_optional
+from utils.timestamps import iso_now
+from auth.okta_auth import aclose_okta_http_client
+from auth.okta_validator import get_current_user_optional, token_validator
 from resource_servers.google_workspace import GoogleWorkspaceResourceServer
 
 # Configure logging
@@ -38,30 +47,50 @@ logging.getLogger("langchain_openai").setLevel(logging.WARNING)  # Suppress Lang
 logging.getLogger("okta_ai_sdk").setLevel(logging.WARNING)  # Suppress Okta AI SDK verbose output (emojis in verification steps)
 logging.getLogger("okta_ai_sdk.cross_app_access").setLevel(logging.WARNING)
 
-# Keep important loggers at DEBUG level for full token visibility and flow details
-# DEBUG logs will show full tokens (first 50 chars + full token for sensitive data)
-logging.getLogger("auth.okta_auth").setLevel(logging.DEBUG)  # Token exchange with full tokens
-logging.getLogger("auth.okta_validator").setLevel(logging.DEBUG)  # Token validation with full tokens
-logging.getLogger("auth.okta_cross_app_access").setLevel(logging.DEBUG)  # ID-JAG exchange with full tokens
-logging.getLogger("orchestrator_agent").setLevel(logging.DEBUG)  # Orchestrator workflow logs
-logging.getLogger("a2a_agents").setLevel(logging.DEBUG)  # Agent processing logs
-logging.getLogger("chat_assistant").setLevel(logging.DEBUG)  # Chat assistant with full MCP tokens
-logging.getLogger("api.main").setLevel(logging.DEBUG)  # API endpoint logs
-logging.getLogger("mcp_servers").setLevel(logging.DEBUG)  # MCP server logs
+# Application loggers default to INFO; set LOG_LEVEL=DEBUG for full token visibility and flow details
+# (DEBUG logs show full tokens and user info, and cost extra formatting on every request)
+APP_LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+for _app_logger in (
+    "auth.okta_auth",  # Token exchange with full tokens
+    "auth.okta_validator",  # Token validation with full tokens
+    "auth.okta_cross_app_access",  # ID-JAG exchange with full tokens
+    "orchestrator_agent",  # Orchestrator workflow logs
+    "a2a_agents",  # Agent processing logs
+    "chat_assistant",  # Chat assistant with full MCP tokens
+    "api.main",  # API endpoint logs
+    "mcp_servers",  # MCP server logs
+):
+    logging.getLogger(_app_logger).setLevel(APP_LOG_LEVEL)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the process-wide Okta HTTP/2 client on shutdown (it is opened on first use)"""
+    try:
+        yield
+    finally:
+        await aclose_okta_http_client()
 
 app = FastAPI(
     title="Streamward AI Assistant API",
     description="Enterprise-grade agentic AI demo with multi-provider authentication",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
+# Explicit methods/headers (what the frontend actually sends) let preflights be answered with
+# set-membership checks instead of echoing back whatever the browser asked for
+FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
+CORS_ALLOW_METHODS = ["GET", "POST", "DELETE"]
+CORS_ALLOW_HEADERS = ["Authorization", "Content-Type", "X-Access-Token"]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[os.getenv("FRONTEND_URL", "http://localhost:3000")],
+    allow_origins=[FRONTEND_URL],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=CORS_ALLOW_METHODS,
+    allow_headers=CORS_ALLOW_HEADERS,
 )
 
 
@@ -71,30 +100,130 @@ app.add_middleware(
 google_workspace_server = GoogleWorkspaceResourceServer()
 streamward_assistant = StreamwardAssistant(google_workspace_server=google_workspace_server)
 
+# Cap on concurrent assistant turns (each may fan out to OpenAI and the A2A agents);
+# requests beyond it wait their turn instead of piling onto the upstream APIs
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "128"))
+_llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+async def _process_message(message: str, user_info: Dict[str, Any], session_id: Optional[str]) -> Dict[str, Any]:
+    """Run one message through the Streamward Assistant, bounded by LLM_MAX_CONCURRENCY"""
+    async with _llm_semaphore:
+        return await streamward_assistant.process_message(message, user_info, session_id)
+
 # Include document routes
 app.include_router(documents_router)
 
 # WebSocket connection manager
+# Messages waiting to be written to one client; further messages are dropped while it is full
+OUTBOUND_QUEUE_SIZE = 1024
+
 class ConnectionManager:
+    """Tracks websocket clients; each client gets an outbound queue drained by its own task,
+    so sending and broadcasting never wait on a slow socket"""
+
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        # websocket -> (outbound queue, drainer task)
+        self.active_connections: Dict[WebSocket, Tuple[asyncio.Queue, asyncio.Task]] = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        self.active_connections[websocket] = (queue, asyncio.create_task(self._drain(websocket, queue)))
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        # pop with default: a socket already dropped by its drainer may disconnect afterwards
+        connection = self.active_connections.pop(websocket, None)
+        if connection:
+            connection[1].cancel()
+
+    async def _drain(self, websocket: WebSocket, queue: asyncio.Queue):
+        """Write queued messages to the client in order, one text frame per message"""
+        while True:
+            message = await queue.get()
+            try:
+                await websocket.send_text(message)
+            except Exception as e:
+                logger.debug("[API] Dropping websocket after failed send: %s", e)
+                self.active_connections.pop(websocket, None)
+                return
+
+    @staticmethod
+    def _enqueue(queue: asyncio.Queue, message: str):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("[API] Websocket outbound queue full, dropping message")
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+        connection = self.active_connections.get(websocket)
+        if connection:
+            self._enqueue(connection[0], message)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        for queue, _ in tuple(self.active_connections.values()):
+            self._enqueue(queue, message)
 
 manager = ConnectionManager()
 
+# Chat response cache: a general / RAG question repeated with the same conversation history in the
+# same session (same user, same token) is answered without another LLM round trip. Opt-in with CACHE_ENABLED=true, since a hit skips the
+# assistant's conversation memory for that turn.
+CHAT_CACHE_ENABLED = os.getenv("CACHE_ENABLED", "false").lower() == "true"
+CHAT_CACHE_SIZE = 512
+CHAT_CACHE_TTL = 300
+
+# (user sub, session id, token digest, prompt category, conversation digest) -> (response, monotonic expiry),
+# least recently used first
+_chat_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def _normalize_message(content: Any) -> str:
+    return _WHITESPACE_RE.sub(" ", str(content)).strip().lower()
+
+def _chat_cache_key(messages: List[Dict[str, Any]], user_info: Dict[str, Any], session_id: str, access_token: Optional[str]) -> tuple:
+    """
+    Cache key for a chat turn: the whole conversation (role + normalized content of every message),
+    so context-dependent follow-ups like "yes" or "tell me more" only hit for the same history
+    """
+    conversation = hashlib.sha256()
+    for message in messages:
+        conversation.update(orjson.dumps([message.get("role"), _normalize_message(message.get("content", ""))]))
+    token_digest = hashlib.sha256(access_token.encode()).hexdigest() if access_token else None
+    return (
+        user_info.get("sub"),
+        session_id,
+        token_digest,
+        user_info.get("prompt_category"),
+        conversation.hexdigest(),
+    )
+
+def _get_cached_chat_response(cache_key: tuple) -> Optional[Dict[str, Any]]:
+    """Return a copy of a fresh cached assistant response, or None"""
+    cached = _chat_cache.get(cache_key)
+    if not cached:
+        return None
+    if cached[1] <= time.monotonic():
+        del _chat_cache[cache_key]
+        return None
+    _chat_cache.move_to_end(cache_key)
+    return copy.deepcopy(cached[0])
+
+def _cache_chat_response(cache_key: tuple, response: Dict[str, Any]) -> None:
+    """
+    Remember a plain general / RAG answer. Workflow, MCP, Google Workspace, account-linking and
+    error responses are never cached: replaying them would skip their side effects (approvals,
+    CIBA, token exchanges) and return stale workflow details
+    """
+    if response.get("agent_type") == "Error Handler" or any(
+        response.get(field) for field in ("workflow_info", "mcp_info", "connected_accounts_flow", "token_exchanges", "requires_linking")
+    ):
+        return
+    _chat_cache[cache_key] = (copy.deepcopy(response), time.monotonic() + CHAT_CACHE_TTL)
+    _chat_cache.move_to_end(cache_key)
+    if len(_chat_cache) > CHAT_CACHE_SIZE:
+        _chat_cache.popitem(last=False)
+
 # Pydantic models
 class ChatMessage(BaseModel):
     message: str
@@ -107,6 +236,17 @@ class ChatMessageList(BaseModel):
     messages: List[Dict[str, Any]]
     session_id: Optional[str] = None
 
+    @field_validator("messages")
+    @classmethod
+    def last_message_has_content(cls, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Reject empty conversations and blank last messages with a 422 before any agent work"""
+        if not messages:
+            raise ValueError("No messages provided")
+        content = messages[-1].get("content")
+        if not isinstance(content, str) or not content.strip():
+            raise ValueError("Last message must have non-empty text content")
+        return messages
+
 class ChatResponse(BaseModel):
     response: str
     agent_type: str
@@ -131,8 +271,7 @@ class TokenExchangeInfo(BaseModel):
     scope: str
     token: str
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 class SimpleChatResponse(BaseModel):
     content: str
@@ -172,7 +311,7 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now()}
+    return {"status": "healthy", "timestamp": iso_now()}
 
 @app.get("/api/config/okta")
 async def get_okta_config():
@@ -183,123 +322,208 @@ async def get_okta_config():
         "audience": os.getenv("OKTA_MAIN_AUDIENCE", "api://streamward-chat")
     }
 
-@app.post("/api/chat", response_model=SimpleChatResponse)
+async def _prepare_chat_turn(request: ChatMessageList, http_request: Request, current_user: Optional[dict]) -> Tuple[str, Dict[str, Any], str, Optional[str]]:
+    """Resolve the message, user_info, session ID and access token for one chat turn"""
+    # Get the last message from the conversation (ChatMessageList guarantees it has content)
+    last_message = request.messages[-1]
+    user_message = last_message['content']
+    prompt_category = last_message.get('prompt_category')
+    
+    # Get session ID from request or use default
+    session_id = request.session_id or 'test-session'
+    
+    logger.debug("[API] Chat: msg=%s..., session=%s, category=%s", user_message[:50], session_id, prompt_category)
+    
+    # Extract access token from headers
+    # Support both header format and body parameters for flexibility
+    custom_access_token = http_request.headers.get('X-Access-Token') or last_message.get('access_token')
+    
+    # Log token availability (redacted to the last 6 characters; never log the raw token)
+    logger.info(
+        "[API] Token source - X-Access-Token: %s, access_token=...%s",
+        bool(http_request.headers.get('X-Access-Token')),
+        custom_access_token[-6:] if custom_access_token else "none"
+    )
+    
+    # Build user_info - prioritize in this order:
+    # 1. User from Authorization header (if provided)
+    # 2. User from custom access token (validate and extract user info)
+    # 3. Demo user (fallback)
+    user_info = None
+    
+    if current_user:
+        # User authenticated via Authorization header
+        logger.debug("[API] User: authenticated via header=%s", current_user.get('email'))
+        user_info = current_user.copy()
+    elif custom_access_token:
+        # Validate access token and extract user info
+        try:
+            validated_user = await token_validator.validate_token(custom_access_token)
+            if validated_user:
+                logger.debug("[API] User: validated from access token=%s", validated_user.get('email'))
+                user_info = validated_user
+            else:
+                logger.warning("[API] Access token validation failed")
+        except Exception as e:
+            logger.warning("[API] Token validation error: %s", e)
+    
+    if not user_info:
+        # Fallback to demo user
+        logger.debug("[API] Using demo user")
+        user_info = {
+            "sub": "demo-user",
+            "email": "demo@streamward.com",
+            "name": "Demo User"
+        }
+    
+    # Add access token to user_info for A2A workflows
+    if custom_access_token:
+        user_info["token"] = custom_access_token
+        user_info["access_token"] = custom_access_token
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "[API] User_session: user=%r, has_access_token=%s, keys=%s",
+            {k: user_info.get(k) for k in ("sub", "email", "name")},
+            bool(custom_access_token),
+            list(user_info.keys())
+        )
+    
+    # Add prompt category to user_info if provided
+    if prompt_category:
+        user_info["prompt_category"] = prompt_category
+        logger.info("[API] Prompt category: %s", prompt_category)
+    
+    return user_message, user_info, session_id, custom_access_token
+
+def _build_chat_response(response: Dict[str, Any]) -> SimpleChatResponse:
+    """Map an assistant response dict onto the chat API response model"""
+    # Everything below comes from our own assistant, so skip validating it field by field
+    return SimpleChatResponse.model_construct(
+        content=response["content"],
+        agentType=response["agent_type"],
+        used_rag=response.get("used_rag", False),
+        rag_info=RAGInfo.model_construct(**response["rag_info"]) if response.get("rag_info") else None,
+        workflow_info=response.get("workflow_info"),
+        agent_flow=response.get("agent_flow"),
+        token_exchanges=response.get("token_exchanges"),
+        source_user_token=response.get("source_user_token"),
+        mcp_info=response.get("mcp_info"),
+        connected_accounts_flow=response.get("connected_accounts_flow"),
+        requires_linking=response.get("requires_linking"),
+        authorization_url=response.get("authorization_url"),
+        auth_session=response.get("auth_session"),  # Note: This is stored server-side, but included for debugging
+        state=response.get("state")
+    )
+
+# No response_model: the body is built from trusted assistant output with model_construct and
+# rendered directly, so FastAPI doesn't re-validate it (the schema is still documented via responses)
+@app.post("/api/chat", response_model=None, responses={200: {"model": SimpleChatResponse}})
 async def chat_endpoint(request: ChatMessageList, http_request: Request, current_user: Optional[dict] = Depends(get_current_user_optional)):
-    """Main chat endpoint that routes messages to appropriate agents"""
+    """
+    Main chat endpoint that routes messages to appropriate agents.
+    An empty conversation or a blank last message is rejected with 422 (validation error), not 500.
+    """
     try:
-        # Get the last message from the conversation
-        if not request.messages:
-            raise HTTPException(status_code=400, detail="No messages provided")
-        
-        last_message = request.messages[-1]
-        user_message = last_message.get('content', '')
-        prompt_category = last_message.get('prompt_category')
-        
-        # Get session ID from request or use default
-        session_id = request.session_id or 'test-session'
-        
-        logger.debug(f"[API] Chat: msg={user_message[:50]}..., session={session_id}, category={prompt_category}")
-        
-        # Extract access token from headers
-        # Support both header format and body parameters for flexibility
-        custom_access_token = http_request.headers.get('X-Access-Token') or last_message.get('access_token')
-        
-        # Log token availability
-        logger.info(f"[API] Token source - X-Access-Token: {bool(http_request.headers.get('X-Access-Token'))}")
-        logger.debug(f"[API] Access token available: {bool(custom_access_token)}")
-        
-        # Log full token at DEBUG level for troubleshooting
-        if custom_access_token:
-            logger.debug(f"[API] Access Token (first 50): {custom_access_token[:50]}...")
-            logger.debug(f"[API] Full Access Token: {custom_access_token}")
-        
-        # Build user_info - prioritize in this order:
-        # 1. User from Authorization header (if provided)
-        # 2. User from custom access token (validate and extract user info)
-        # 3. Demo user (fallback)
-        user_info = None
-        
-        if current_user:
-            # User authenticated via Authorization header
-            logger.debug(f"[API] User: authenticated via header={current_user.get('email')}")
-            user_info = current_user.copy()
-        elif custom_access_token:
-            # Validate access token and extract user info
-            try:
-                from auth.okta_validator import token_validator
-                validated_user = await token_validator.validate_token(custom_access_token)
-                if validated_user:
-                    logger.debug(f"[API] User: validated from access token={validated_user.get('email')}")
-                    user_info = validated_user
-                else:
-                    logger.warning("[API] Access token validation failed")
-            except Exception as e:
-                logger.warning(f"[API] Token validation error: {str(e)}")
-        
-        if not user_info:
-            # Fallback to demo user
-            logger.debug("[API] Using demo user")
-            user_info = {
-                "sub": "demo-user",
-                "email": "demo@streamward.com",
-                "name": "Demo User"
-            }
-        
-        # Add access token to user_info for A2A workflows
-        if custom_access_token:
-            user_info["token"] = custom_access_token
-            user_info["access_token"] = custom_access_token
-        
-        logger.info(f"[API] User_session: email={user_info['email']}, has_access_token={bool(custom_access_token)}")
-        logger.debug(f"[API] User_info keys: {list(user_info.keys())}")
+        user_message, user_info, session_id, custom_access_token = await _prepare_chat_turn(request, http_request, current_user)
         
-        # Add prompt category to user_info if provided
-        if prompt_category:
-            user_info["prompt_category"] = prompt_category
-            logger.info(f"[API] Prompt category: {prompt_category}")
-        
-        # Process message through Streamward Assistant (with memory management)
-        response = await streamward_assistant.process_message(
-            user_message,
-            user_info,
-            session_id
-        )
+        cache_key = _chat_cache_key(request.messages, user_info, session_id, custom_access_token) if CHAT_CACHE_ENABLED else None
+        response = _get_cached_chat_response(cache_key) if cache_key else None
+        if response is not None:
+            logger.debug("[API] Chat cache hit: session=%s", session_id)
+        else:
+            # Process message through Streamward Assistant (with memory management)
+            response = await _process_message(
+                user_message,
+                user_info,
+                session_id
+            )
+            if cache_key:
+                _cache_chat_response(cache_key, response)
         
-        response_data = SimpleChatResponse(
-            content=response["content"],
-            agentType=response["agent_type"],
-            used_rag=response.get("used_rag", False),
-            rag_info=RAGInfo(**response.get("rag_info", {})) if response.get("rag_info") else None,
-            workflow_info=response.get("workflow_info"),
-            agent_flow=response.get("agent_flow"),
-            token_exchanges=response.get("token_exchanges"),
-            source_user_token=response.get("source_user_token"),
-            mcp_info=response.get("mcp_info"),
-            connected_accounts_flow=response.get("connected_accounts_flow"),
-            requires_linking=response.get("requires_linking"),
-            authorization_url=response.get("authorization_url"),
-            auth_session=response.get("auth_session"),  # Note: This is stored server-side, but included for debugging
-            state=response.get("state")
-        )
+        response_data = _build_chat_response(response)
         
         # Log response details
-        logger.debug(f"[API] Response: agent_type={response['agent_type']}, has_agent_flow={bool(response_data.agent_flow)}, has_token_exchanges={bool(response_data.token_exchanges)}, has_mcp_info={bool(response_data.mcp_info)}, used_rag={response_data.used_rag}")
+        logger.debug("[API] Response: agent_type=%s, has_agent_flow=%s, has_token_exchanges=%s, has_mcp_info=%s, used_rag=%s", response['agent_type'], bool(response_data.agent_flow), bool(response_data.token_exchanges), bool(response_data.mcp_info), response_data.used_rag)
         
-        return response_data
+        return ORJSONResponse(response_data.model_dump())
         
     except Exception as e:
-        logger.error(f"Chat processing error: {e}")
+        logger.error("Chat processing error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+def _sse(data: Dict[str, Any], event: Optional[str] = None) -> bytes:
+    """Encode one Server-Sent Events frame with a JSON payload"""
+    frame = b"data: " + orjson.dumps(data) + b"\n\n"
+    return b"event: " + event.encode() + b"\n" + frame if event else frame
+
+async def _stream_assistant_reply(user_message: str, user_info: Dict[str, Any], session_id: str, chunks: asyncio.Queue) -> None:
+    """
+    Put one streamed assistant reply onto chunks, followed by None. The LLM concurrency slot is held
+    only while generating, so a slow SSE reader doesn't keep it (chunks are buffered in the queue)
+    """
+    try:
+        async with _llm_semaphore:
+            async for chunk in streamward_assistant.stream_message(user_message, user_info, session_id):
+                chunks.put_nowait(chunk)
+    finally:
+        chunks.put_nowait(None)
+
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatMessageList, http_request: Request, current_user: Optional[dict] = Depends(get_current_user_optional)):
+    """
+    Streaming variant of /api/chat (Server-Sent Events): one data frame per reply chunk as the
+    LLM generates it, then an "event: done" frame with the full SimpleChatResponse
+    (agent_flow, token_exchanges, etc.). Workflow / MCP replies arrive whole in the done frame.
+    Empty payloads get the same 422 as /api/chat, before the stream starts.
+    """
+    try:
+        user_message, user_info, session_id, custom_access_token = await _prepare_chat_turn(request, http_request, current_user)
+    except Exception as e:
+        logger.error("Chat processing error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
+    
+    cache_key = _chat_cache_key(request.messages, user_info, session_id, custom_access_token) if CHAT_CACHE_ENABLED else None
+    
+    async def events():
+        producer = None
+        try:
+            response = _get_cached_chat_response(cache_key) if cache_key else None
+            if response is None:
+                chunks: asyncio.Queue = asyncio.Queue()
+                producer = asyncio.create_task(_stream_assistant_reply(user_message, user_info, session_id, chunks))
+                while (chunk := await chunks.get()) is not None:
+                    if "delta" in chunk:
+                        yield _sse(chunk)
+                    else:
+                        response = chunk["done"]
+                await producer  # re-raise any generation error
+                if cache_key:
+                    _cache_chat_response(cache_key, response)
+            yield _sse(_build_chat_response(response).model_dump(), event="done")
+        except Exception as e:
+            logger.error("Chat streaming error: %s", e)
+            yield _sse({"detail": "Internal server error"}, event="error")
+        finally:
+            # Client went away mid-stream: stop generating instead of leaving an orphaned task
+            if producer and not producer.done():
+                producer.cancel()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.post("/api/chat/authenticated", response_model=ChatResponse)
 async def chat_endpoint_authenticated(message: ChatMessage):
     """Authenticated chat endpoint that routes messages to appropriate agents"""
     try:
         current_user = get_current_user()
-        logger.info(f"Chat message from user {current_user.get('sub', 'unknown')}: {message.message}")
+        logger.info("Chat message from user %s: %s", current_user.get('sub', 'unknown'), message.message)
         
         # Process message through Streamward Assistant
-        response = await streamward_assistant.process_message(
+        response = await _process_message(
             message.message,
             current_user,
             message.session_id or "default-session"
@@ -313,7 +537,7 @@ async def chat_endpoint_authenticated(message: ChatMessage):
         )
         
     except Exception as e:
-        logger.error(f"Chat processing error: {e}")
+        logger.error("Chat processing error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.post("/api/orchestrator/workflow", response_model=WorkflowResponse)
@@ -323,7 +547,7 @@ async def trigger_workflow(
     """Trigger complex multi-agent workflows"""
     try:
         current_user = get_current_user()
-        logger.info(f"Workflow request from user {current_user.get('sub', 'unknown')}: {request.workflow_type}")
+        logger.info("Workflow request from user %s: %s", current_user.get('sub', 'unknown'), request.workflow_type)
         
         # Process through orchestrator agent (simplified)
         result = {"status": "simplified", "message": "Workflow processing simplified for testing"}
@@ -335,7 +559,7 @@ async def trigger_workflow(
         )
         
     except Exception as e:
-        logger.error(f"Workflow execution error: {e}")
+        logger.error("Workflow execution error: %s", e)
         raise HTTPException(status_code=500, detail="Workflow execution failed")
 
 @app.post("/api/documents/search")
@@ -345,7 +569,7 @@ async def search_documents(
     """Search documents with DPOP protection"""
     try:
         current_user = get_current_user()
-        logger.info(f"Document search from user {current_user.get('sub', 'unknown')}: {query}")
+        logger.info("Document search from user %s: %s", current_user.get('sub', 'unknown'), query)
         
         # Search through RAG tool (simplified)
         results = [{"title": "Sample Document", "content": f"Search results for: {query}", "score": 0.95}]
@@ -357,7 +581,7 @@ async def search_documents(
         }
         
     except Exception as e:
-        logger.error(f"Document search error: {e}")
+        logger.error("Document search error: %s", e)
         raise HTTPException(status_code=500, detail="Document search failed")
 
 @app.get("/api/agents/status")
@@ -367,8 +591,8 @@ async def get_agent_status():
         "streamward_assistant": "active",
         "openai_integration": "active",
         "memory_management": "active",
-        "active_sessions": len(streamward_assistant.sessions),
-        "timestamp": datetime.now()
+        "active_sessions": streamward_assistant.session_count,
+        "timestamp": iso_now()
     }
 
 @app.get("/api/sessions/{session_id}")
@@ -406,27 +630,31 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
         while True:
             # Receive message from client
             data = await websocket.receive_text()
-            message_data = json.loads(data)
+            message_data = orjson.loads(data)
             
             # Process message
-            response = await streamward_assistant.process_message(
+            response = await _process_message(
                 message_data["message"],
                 {"sub": user_id},
                 message_data.get("session_id")
             )
             
             # Send response back
+            # Frames stay text so existing clients can JSON.parse them unchanged
             await manager.send_personal_message(
-                json.dumps({
+                orjson.dumps({
                     "response": response["content"],
                     "agent_type": response["agent_type"],
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": iso_now(),
                     "session_id": response["session_id"]
-                }),
+                }).decode(),
                 websocket
             )
             
     except WebSocketDisconnect:
+        pass
+    finally:
+        # Always release the client's outbound queue and drainer, including after malformed frames
         manager.disconnect(websocket)
 
 # Google Workspace Resource Server Endpoints
@@ -450,7 +678,6 @@ async def get_google_authorization_url(request: Request, current_user: Optional[
                 raise HTTPException(status_code=401, detail="Okta access token required")
         
         # Extract user info from token for multi-user support
-        from auth.okta_validator import token_validator
         user_info = await token_validator.validate_token(okta_access_token)
         user_sub = user_info.get("sub") if user_info else None
         
@@ -476,7 +703,7 @@ async def get_google_authorization_url(request: Request, current_user: Optional[
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"[API] Error getting Google authorization URL: {str(e)}", exc_info=True)
+        logger.error("[API] Error getting Google authorization URL: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error getting authorization URL: {str(e)}")
 
 @app.post("/api/resource/google-workspace/complete-linking")
@@ -502,23 +729,23 @@ async def complete_google_linking(request: Request, current_user: Optional[dict]
                 raise HTTPException(status_code=401, detail="Okta access token required")
         
         # Extract user info from token for multi-user support
-        from auth.okta_validator import token_validator
         user_info = await token_validator.validate_token(okta_access_token)
         if not user_info:
             raise HTTPException(status_code=401, detail="Invalid token")
         user_sub = user_info.get("sub")
         
-        logger.info(f"[API] complete-linking - user_info keys: {list(user_info.keys())}")
-        logger.info(f"[API] complete-linking - user_info['sub']: {user_info.get('sub')}")
-        logger.info(f"[API] complete-linking - user_info['email']: {user_info.get('email')}")
-        logger.info(f"[API] complete-linking - extracted user_sub: {user_sub}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[API] complete-linking - user_info keys: %s", list(user_info.keys()))
+            logger.debug("[API] complete-linking - user_info['sub']: %s", user_info.get('sub'))
+            logger.debug("[API] complete-linking - user_info['email']: %s", user_info.get('email'))
+            logger.debug("[API] complete-linking - extracted user_sub: %s", user_sub)
         
         if not user_sub:
             raise HTTPException(status_code=400, detail="User identifier not found in token")
         
         # Complete linking (auth_session retrieved server-side by user_sub)
-        logger.info(f"[API] Completing Google linking for user: {user_sub}")
-        logger.debug(f"[API] Connect code length: {len(connect_code) if connect_code else 0}")
+        logger.info("[API] Completing Google linking for user: %s", user_sub)
+        logger.debug("[API] Connect code length: %s", len(connect_code) if connect_code else 0)
         
         result = await google_workspace_server._complete_linking_and_get_token(
             connect_code=connect_code,
@@ -526,11 +753,11 @@ async def complete_google_linking(request: Request, current_user: Optional[dict]
             user_sub=user_sub
         )
         
-        logger.debug(f"[API] Linking result: {result}")
+        logger.debug("[API] Linking result: %s", result)
         
         if result.get("error"):
             error_msg = result.get("message", "Failed to complete linking")
-            logger.error(f"[API] Linking failed: {error_msg}")
+            logger.error("[API] Linking failed: %s", error_msg)
             raise HTTPException(status_code=500, detail=error_msg)
         
         return {
@@ -546,9 +773,11 @@ async def complete_google_linking(request: Request, current_user: Optional[dict]
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"[API] Error completing Google linking: {str(e)}", exc_info=True)
+        logger.error("[API] Error completing Google linking: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error completing linking: {str(e)}")
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop is installed on every platform except Windows (see requirements.txt)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="asyncio" if sys.platform == "win32" else "uvloop")
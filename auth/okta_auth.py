@@ -1,3 +1,4 @@
+import asyncio
 import httpx
 import jwt
 import json
@@ -14,6 +15,32 @@ from auth.okta_scopes import OKTA_SCOPES, get_default_hr_scopes, get_default_fin
 
 logger = logging.getLogger(__name__)
 
+# Keep-alive HTTP/2 client shared by every OktaAuth instance in the process, created on first use
+# so repeat requests skip the TCP/TLS handshake (closed by the API on shutdown)
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_okta_http_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide Okta HTTP client, creating it on first use
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+            timeout=httpx.Timeout(5.0)
+        )
+    return _http_client
+
+async def aclose_okta_http_client() -> None:
+    """
+    Close the process-wide Okta HTTP client (call on application shutdown)
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 class OktaAuth:
     """
     Okta authentication handler for ID token validation and user management
@@ -182,17 +209,16 @@ class OktaAuth:
             return self._jwks_cache
         
         # Fetch fresh JWKS
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.jwks_url)
-            response.raise_for_status()
-            
-            jwks = response.json()
-            
-            # Cache for 1 hour
-            self._jwks_cache = jwks
-            self._jwks_cache_expiry = datetime.now() + timedelta(hours=1)
-            
-            return jwks
+        response = await get_okta_http_client().get(self.jwks_url)
+        response.raise_for_status()
+        
+        jwks = response.json()
+        
+        # Cache for 1 hour
+        self._jwks_cache = jwks
+        self._jwks_cache_expiry = datetime.now() + timedelta(hours=1)
+        
+        return jwks
 
     async def get_user_info(self, user_id: str) -> Dict[str, Any]:
         """
@@ -315,7 +341,7 @@ class OktaAuth:
             ```
         """
         try:
-            logger.info(f"[TOKEN_EXCHANGE] Starting: audience={target_audience}, scope={scope}, source_agent={source_agent or 'user-to-agent'}")
+            logger.info("[TOKEN_EXCHANGE] Starting: audience=%s, scope=%s, source_agent=%s", target_audience, scope, source_agent or 'user-to-agent')
             
             # Determine which authorization server to use based on target audience
             authorization_server_id = self.audience_to_server_map.get(target_audience)
@@ -343,17 +369,17 @@ class OktaAuth:
                     service_creds = agent_cred_map[source_agent.lower()]
                     client_id = service_creds["client_id"]
                     client_secret = service_creds["client_secret"]
-                    logger.info(f"[TOKEN_EXCHANGE] Using {source_agent} service app credentials")
+                    logger.info("[TOKEN_EXCHANGE] Using %s service app credentials", source_agent)
                 else:
                     # Fallback to Chat Assistant if invalid source_agent
                     client_id = self.client_id
                     client_secret = self.client_secret
-                    logger.warning(f"[TOKEN_EXCHANGE] Unknown source_agent '{source_agent}', using Chat Assistant credentials")
+                    logger.warning("[TOKEN_EXCHANGE] Unknown source_agent '%s', using Chat Assistant credentials", source_agent)
             else:
                 # User-to-agent exchange - use Chat Assistant credentials (default)
                 client_id = self.client_id
                 client_secret = self.client_secret
-                logger.info(f"[TOKEN_EXCHANGE] Using Chat Assistant credentials for user-to-agent exchange")
+                logger.info("[TOKEN_EXCHANGE] Using Chat Assistant credentials for user-to-agent exchange")
             
             # Get SDK instance for this authorization server
             sdk = self._get_sdk_for_server(authorization_server_id, client_id, client_secret)
@@ -369,19 +395,21 @@ class OktaAuth:
                 scope=scope
             )
             
-            logger.info(f"[TOKEN_EXCHANGE] Calling {self.okta_domain}/oauth2/{authorization_server_id}/v1/token")
+            logger.info("[TOKEN_EXCHANGE] Calling %s/oauth2/%s/v1/token", self.okta_domain, authorization_server_id)
             
-            # Perform token exchange using the appropriate SDK
-            exchange_response = sdk.token_exchange.exchange_token(exchange_request)
+            # Perform token exchange using the appropriate SDK. The SDK call is synchronous, so run it
+            # in a worker thread: the event loop stays free and gathered exchanges actually overlap
+            exchange_response = await asyncio.to_thread(sdk.token_exchange.exchange_token, exchange_request)
             
-            logger.info(f"[TOKEN_EXCHANGE] SUCCESS: type={exchange_response.issued_token_type}, expires={exchange_response.expires_in}s")
-            logger.debug(f"[TOKEN_EXCHANGE] Generated token (first 50 chars): {exchange_response.access_token[:50]}...")
-            logger.debug(f"[TOKEN_EXCHANGE] Full token: {exchange_response.access_token}")
+            logger.info("[TOKEN_EXCHANGE] SUCCESS: type=%s, expires=%ss", exchange_response.issued_token_type, exchange_response.expires_in)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[TOKEN_EXCHANGE] Generated token (first 50 chars): %s...", exchange_response.access_token[:50])
+                logger.debug("[TOKEN_EXCHANGE] Full token: %s", exchange_response.access_token)
             
             return exchange_response.access_token
             
         except Exception as e:
-            logger.error(f"[TOKEN_EXCHANGE] FAILED: audience={target_audience}, error={str(e)}", exc_info=True)
+            logger.error("[TOKEN_EXCHANGE] FAILED: audience=%s, error=%s", target_audience, e, exc_info=True)
             raise ValueError(f"Token exchange failed: {str(e)}")
     
     def verify_token(self, token: str, issuer: Optional[str] = None, audience: Optional[str] = None) -> Dict[str, Any]:
@@ -2,8 +2,12 @@
 Okta Token Validation for FastAPI
 """
 import os
+import copy
+import hashlib
 import logging
 import asyncio
+import time
+from collections import OrderedDict
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -15,6 +19,10 @@ logger = logging.getLogger(__name__)
 # Security scheme for Bearer token
 security = HTTPBearer()
 
+# Validated claims are reused until the token expires, for at most VALIDATED_TOKEN_CACHE_TTL seconds
+VALIDATED_TOKEN_CACHE_SIZE = 4096
+VALIDATED_TOKEN_CACHE_TTL = 300
+
 class OktaTokenValidator:
     """Validates Okta JWT tokens"""
     
@@ -26,6 +34,8 @@ class OktaTokenValidator:
         # No default path - will use issuer from token
         self.issuer = None  # Will be set from token
         self.verifier = None  # Will be initialized on first token
+        # blake2b(token) -> (user info, monotonic expiry), least recently used first
+        self._validated_cache: "OrderedDict[str, tuple]" = OrderedDict()
         
         # Verifier will be initialized lazily from the first token
         logger.debug("Okta validator initialized (lazy initialization from token)")
@@ -48,6 +58,14 @@ class OktaTokenValidator:
                 'claims': {'test': True}
             }
         
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+        cached = self._validated_cache.get(cache_key)
+        if cached:
+            if cached[1] > time.monotonic():
+                self._validated_cache.move_to_end(cache_key)
+                return copy.deepcopy(cached[0])
+            del self._validated_cache[cache_key]
+        
         try:
             # Decode the token (without verification) to get issuer, audience, and claims
             import jwt as pyjwt
@@ -133,11 +151,24 @@ class OktaTokenValidator:
             }
             
             logger.debug(f"Token validated for user: {user_info['email']}")
+            self._cache_validated_token(cache_key, user_info, jwt_claims.get('exp'))
             return user_info
             
         except Exception as e:
             logger.error(f"Token validation failed: {e}")
             return None
+    
+    def _cache_validated_token(self, cache_key: str, user_info: Dict[str, Any], exp: Optional[int]) -> None:
+        """Remember validated user info until the token's exp claim (capped at the cache TTL)"""
+        ttl = VALIDATED_TOKEN_CACHE_TTL
+        if exp:
+            ttl = min(ttl, exp - time.time())
+        if ttl <= 0:
+            return
+        self._validated_cache[cache_key] = (copy.deepcopy(user_info), time.monotonic() + ttl)
+        self._validated_cache.move_to_end(cache_key)
+        if len(self._validated_cache) > VALIDATED_TOKEN_CACHE_SIZE:
+            self._validated_cache.popitem(last=False)
 
 # Global validator instance
 token_validator = OktaTokenValidator()
@@ -2,7 +2,8 @@ import asyncio
 import json
 import logging
 import os
-from typing import Dict, Any, Optional, List
+import threading
+from typing import Dict, Any, Optional, List, Callable, AsyncIterator
 from datetime import datetime
 import uuid
 import re
@@ -113,9 +114,12 @@ Google Workspace Resource Server.
 Be helpful, professional, and conversational while maintaining enterprise-grade security awareness.
 """
     
-    async def process_message(self, message: str, user_info: Dict[str, Any], session_id: str) -> Dict[str, Any]:
+    async def process_message(self, message: str, user_info: Dict[str, Any], session_id: str,
+                              on_delta: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
-        Process a user message with full context preservation and RAG capabilities
+        Process a user message with full context preservation and RAG capabilities.
+        If on_delta is given, the general chat reply is streamed from OpenAI and each content
+        chunk is passed to it as it arrives (workflow / MCP / resource replies are not streamed).
         """
         try:
             logger.info(f"Processing message for session {session_id}: {message[:100]}...")
@@ -521,17 +525,20 @@ Be helpful, professional, and conversational while maintaining enterprise-grade
                 logger.debug(f"[PROMPT] User message: {message}")
             
             # Call OpenAI API with full conversation context
-            response = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.client.chat.completions.create(
-                    model=self.model,
-                    messages=openai_messages,
-                    max_tokens=1000,
-                    temperature=0.7
+            if on_delta:
+                content = await self._stream_completion(openai_messages, on_delta)
+            else:
+                response = await asyncio.get_event_loop().run_in_executor(
+                    None,
+                    lambda: self.client.chat.completions.create(
+                        model=self.model,
+                        messages=openai_messages,
+                        max_tokens=1000,
+                        temperature=0.7
+                    )
                 )
-            )
-            
-            content = response.choices[0].message.content
+                
+                content = response.choices[0].message.content
             
             # Update conversation history in memory
             self.sessions[session_id]["conversation_history"].append({"role": "user", "content": message})
@@ -1026,6 +1033,71 @@ Be helpful, professional, and conversational while maintaining enterprise-grade
                 "error": str(e)
             }
     
+    async def _stream_completion(self, openai_messages: List[Dict[str, Any]], on_delta: Callable[[str], None]) -> str:
+        """
+        Run a streaming chat completion off the event loop, handing each content chunk to
+        on_delta on the loop thread, and return the full reply
+        """
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+        
+        def run() -> str:
+            parts = []
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=openai_messages,
+                max_tokens=1000,
+                temperature=0.7,
+                stream=True
+            )
+            try:
+                for chunk in stream:
+                    if stop.is_set():
+                        break
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        loop.call_soon_threadsafe(on_delta, delta)
+            finally:
+                # Closing the response aborts generation upstream when we stop early
+                stream.close()
+            return "".join(parts)
+        
+        future = loop.run_in_executor(None, run)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Cancelling the await doesn't stop the worker thread: signal it and wait until the
+            # stream is closed, so the caller's LLM slot is only released once the request is gone
+            stop.set()
+            await asyncio.wait([future])
+            raise
+    
+    async def stream_message(self, message: str, user_info: Dict[str, Any], session_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of process_message: yields {"delta": text} chunks as the reply is generated,
+        then {"done": response} with the same response dict process_message returns
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        # Deltas are queued before the task finishes, so the None sentinel always comes last
+        task = asyncio.create_task(self.process_message(message, user_info, session_id, on_delta=queue.put_nowait))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (delta := await queue.get()) is not None:
+                yield {"delta": delta}
+            yield {"done": task.result()}
+        finally:
+            # Consumer stopped early (client disconnected or cancelled): don't leave the turn running untracked
+            if not task.done():
+                task.cancel()
+                # Wait for the turn to wind down so the model stream is closed before we return
+                await asyncio.wait([task])
+    
+    @property
+    def session_count(self) -> int:
+        """Number of active sessions"""
+        return len(self.sessions)
+    
     def get_session_info(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get information about a session"""
         return self.sessions.get(session_id)
@@ -1040,7 +1112,7 @@ Be helpful, professional, and conversational while maintaining enterprise-grade
     def get_all_sessions(self) -> Dict[str, Any]:
         """Get information about all active sessions"""
         return {
-            "active_sessions": len(self.sessions),
+            "active_sessions": self.session_count,
             "sessions": {
                 sid: {
                     "message_count": data["message_count"],
@@ -33,6 +33,14 @@ export async function POST(request: Request) {
       }),
     });
 
+    // Empty conversations and blank messages are rejected by validation (422), not a backend failure
+    if (response.status === 422) {
+      return NextResponse.json(
+        { content: 'Please enter a message before sending.', agentType: 'Chat Assistant' },
+        { status: 422 }
+      );
+    }
+
     if (!response.ok) {
       console.error(`[CHAT_API] Backend error: status=${response.status}`);
       throw new Error(`Backend responded with status: ${response.status}`);
@@ -0,0 +1 @@
+# Streamward AI Assistant - Shared Utilities Module
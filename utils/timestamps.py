@@ -0,0 +1,17 @@
+"""
+Timestamp helpers shared by the API and the agents
+"""
+import time
+from datetime import datetime
+from typing import Tuple
+
+# (epoch second, ISO timestamp) for the most recent second seen
+_iso_cache: Tuple[int, str] = (-1, "")
+
+def iso_now() -> str:
+    """Current local ISO timestamp (second precision), formatted at most once per second"""
+    global _iso_cache
+    second = int(time.time())
+    if second != _iso_cache[0]:
+        _iso_cache = (second, datetime.fromtimestamp(second).isoformat())
+    return _iso_cache[1]